@@ -0,0 +1,8 @@
+"""
+pytest configuration for running the tests from a source checkout.
+"""
+import os
+import sys
+
+# Make easytrade importable without an editable install
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
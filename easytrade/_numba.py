@@ -0,0 +1,18 @@
+"""
+Optional Numba support shared by the numeric kernel modules.
+
+Kernels are decorated with njit from here. Without Numba the decorator returns
+the function unchanged and NUMBA_AVAILABLE is False, so callers can choose a
+NumPy implementation for loops that would be slow as regular Python.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is an optional dependency
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback decorator used when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
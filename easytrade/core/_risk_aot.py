@@ -0,0 +1,26 @@
+"""
+Ahead-of-time build of the risk kernels.
+
+Compiles the kernels in _risk_kernels.py into the easytrade.core.risk_kernels
+extension module, so the risk manager does not pay the Numba JIT compile cost
+in each new interpreter session. Requires Numba.
+
+Build in place with:
+    python -m easytrade.core._risk_aot
+"""
+import os
+
+from numba.pycc import CC
+
+from easytrade.core._risk_kernels import _evaluate_limits
+
+
+cc = CC('risk_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The LIMIT_* status codes fit in an int8
+cc.export('evaluate_limits', 'Tuple((i1, f8))(f8, f8, f8, f8, f8, b1, f8, f8, f8)')(_evaluate_limits)
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -0,0 +1,86 @@
+"""
+Numeric kernels used by the risk manager.
+
+The kernels only take and return plain scalars so they can be compiled with
+Numba when it is installed. Without Numba they run as regular Python functions.
+If the ahead-of-time build from _risk_aot.py is present it is used instead, which
+avoids the JIT compile on first call.
+"""
+from typing import Tuple
+
+from easytrade._numba import njit
+
+
+# Status codes returned by evaluate_limits
+LIMIT_APPROVED = 0
+LIMIT_MODIFIED = 1
+LIMIT_REJECTED_POSITION = -1
+LIMIT_REJECTED_CONCENTRATION = -2
+
+
+def _evaluate_limits(equity: float, quantity: float, order_price: float,
+                     current_position_value: float, total_position_value: float,
+                     side_is_buy: bool, max_order_size: float, max_position_size: float,
+                     max_concentration: float) -> Tuple[int, float]:
+    """
+    Evaluate order size, position size and concentration limits for an order.
+
+    Each limit is turned into a cap on the order quantity and the order is
+    reduced to the smallest cap, so the result satisfies all limits at once.
+
+    Args:
+        equity: Current portfolio equity
+        quantity: Requested order quantity
+        order_price: Price used to value the order
+        current_position_value: Market value of the existing position in the symbol
+        total_position_value: Market value of all positions in the portfolio
+        side_is_buy: True for buy orders, False for sell orders
+        max_order_size: Maximum order size as a fraction of portfolio value
+        max_position_size: Maximum position size as a fraction of portfolio value
+        max_concentration: Maximum concentration in a single symbol
+
+    Returns:
+        Tuple of (status, modified_quantity)
+        - status: LIMIT_APPROVED, LIMIT_MODIFIED or one of the LIMIT_REJECTED_* codes
+        - modified_quantity: New order quantity if status is LIMIT_MODIFIED, 0.0 otherwise
+    """
+    if equity <= 0:
+        return LIMIT_APPROVED, 0.0
+
+    # Order size applies to both sides
+    allowed = min(quantity, (max_order_size * equity) / order_price)
+    if not side_is_buy:
+        if allowed < quantity:
+            return LIMIT_MODIFIED, allowed
+        return LIMIT_APPROVED, 0.0
+
+    current_value = max(current_position_value, 0.0)
+
+    # Position size
+    cap_position = max((max_position_size * equity) - current_value, 0.0) / order_price
+
+    if cap_position <= 0:
+        return LIMIT_REJECTED_POSITION, 0.0
+    allowed = min(allowed, cap_position)
+
+    # Concentration, measured against the other holdings. There is no limit when a
+    # single symbol may hold the whole portfolio, or when nothing else is held yet,
+    # so the first position can be opened from cash. There is no infinite cap for
+    # these cases, since fastmath assumes no infinities.
+    other_position_value = total_position_value - current_position_value
+    if max_concentration < 1 and other_position_value > 0:
+        max_position_value = max_concentration * other_position_value / (1 - max_concentration)
+        cap_concentration = max(max_position_value - current_value, 0.0) / order_price
+        if cap_concentration <= 0:
+            return LIMIT_REJECTED_CONCENTRATION, 0.0
+        allowed = min(allowed, cap_concentration)
+
+    if allowed < quantity:
+        return LIMIT_MODIFIED, allowed
+    return LIMIT_APPROVED, 0.0
+
+
+try:
+    from easytrade.core.risk_kernels import evaluate_limits  # Built by _risk_aot.py
+except ImportError:
+    evaluate_limits = njit(cache=True, fastmath=True)(_evaluate_limits)
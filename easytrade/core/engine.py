@@ -2,13 +2,49 @@
 Trading engine that connects data providers, execution providers, and strategies.
 """
 import logging
+import threading
+from dataclasses import replace
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime, timedelta
 
 from easytrade.core.strategy import Strategy
+from easytrade.core.event_queue import EventQueue
 from easytrade.data.data_provider import DataProvider
 from easytrade.execution.execution_provider import ExecutionProvider
-from easytrade.core.types import Order, OrderType, OrderSide, TimeInForce, Position, Portfolio, Trade, Bar
+from easytrade.core.types import (
+    Order, OrderRequest, OrderType, OrderSide, TimeInForce, Position, Portfolio, Trade, Bar, BarBatch
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Days per period unit for get_historical_data ('m' is months, not minutes)
+_PERIOD_UNIT_DAYS = {'d': 1, 'm': 30, 'y': 365}
+
+# Period string -> timedelta, filled on first use of each period
+_PERIOD_DELTAS = {}
+
+
+def _parse_period(period: str) -> timedelta:
+    """
+    Convert a period string such as '5d', '3m' or '1y' to a timedelta.
+    
+    Args:
+        period: Time period string
+        
+    Returns:
+        timedelta covering the period
+    """
+    delta = _PERIOD_DELTAS.get(period)
+    if delta is None:
+        unit_days = _PERIOD_UNIT_DAYS.get(period[-1:])
+        if unit_days is None:
+            raise ValueError(f"Invalid period: {period}")
+            
+        delta = timedelta(days=int(period[:-1]) * unit_days)
+        _PERIOD_DELTAS[period] = delta
+        
+    return delta
 
 
 class TradingEngine:
@@ -19,8 +55,15 @@ class TradingEngine:
     between the data provider, execution provider, and strategy.
     """
     
+    __slots__ = (
+        'data_provider', 'execution_provider', 'strategy', 'risk_manager',
+        'threaded_dispatch', '_running', '_events', '_dispatch_thread', '_dispatching',
+        '_process_market_data', '_process_market_data_batch', '_strategy_on_data',
+        '_strategy_on_data_batch', '_strategy_on_order_update', '_strategy_on_trade'
+    )
+    
     def __init__(self, data_provider: DataProvider, execution_provider: ExecutionProvider,
-                strategy: Strategy, risk_manager=None):
+                strategy: Strategy, risk_manager=None, threaded_dispatch: bool = False):
         """
         Initialize the trading engine.
         
@@ -29,50 +72,104 @@ class TradingEngine:
             execution_provider: Execution provider to use
             strategy: Strategy to run
             risk_manager: Risk manager to use (optional)
+            threaded_dispatch: If True, events from provider threads are queued and
+                handled on a dedicated dispatch thread, so providers never block on
+                strategy code
         """
-        self.logger = logging.getLogger(self.__class__.__name__)
         self.data_provider = data_provider
         self.execution_provider = execution_provider
         self.strategy = strategy
         self.risk_manager = risk_manager
+        self.threaded_dispatch = threaded_dispatch
+        
+        # Bound methods called on every event, resolved once
+        self._process_market_data = execution_provider.process_market_data
+        self._process_market_data_batch = execution_provider.process_market_data_batch
+        self._strategy_on_data = strategy.on_data
+        self._strategy_on_data_batch = strategy.on_data_batch
+        self._strategy_on_order_update = strategy.on_order_update
+        self._strategy_on_trade = strategy.on_trade
         
         # Set up connections
         self.strategy.set_engine(self)
+        if self.risk_manager is not None:
+            self.risk_manager.set_engine(self)
         self.data_provider.add_subscriber(self)
         self.execution_provider.add_order_callback(self.on_order_update)
         self.execution_provider.add_trade_callback(self.on_trade)
         
         self._running = False
+        self._events = None
+        self._dispatch_thread = None
+        self._dispatching = False
         
     def start(self):
         """Start the trading engine."""
         if self._running:
-            self.logger.warning("Trading engine already running")
+            logger.warning("Trading engine already running")
             return
             
         self._running = True
         
+        # Start dispatch thread before any events can arrive
+        if self.threaded_dispatch:
+            self._start_dispatcher()
+            
         # Start components
         self.execution_provider.start()
         self.strategy.on_start()
         self.data_provider.start()
         
-        self.logger.info("Trading engine started")
+        logger.info("Trading engine started")
         
     def stop(self):
         """Stop the trading engine."""
         if not self._running:
-            self.logger.warning("Trading engine not running")
+            logger.warning("Trading engine not running")
             return
             
         self._running = False
         
         # Stop components
         self.data_provider.stop()
+        self._stop_dispatcher()
         self.strategy.on_stop()
         self.execution_provider.stop()
         
-        self.logger.info("Trading engine stopped")
+        logger.info("Trading engine stopped")
+        
+    def _start_dispatcher(self):
+        """Start the thread that handles queued events."""
+        self._events = EventQueue()
+        self._dispatching = True
+        self._dispatch_thread = threading.Thread(target=self._dispatch_events)
+        self._dispatch_thread.daemon = True
+        self._dispatch_thread.start()
+        
+    def _stop_dispatcher(self):
+        """Stop the dispatch thread after it has handled all queued events."""
+        if self._dispatch_thread is None:
+            return
+            
+        self._dispatching = False
+        self._events.wake()
+        self._dispatch_thread.join()
+        self._dispatch_thread = None
+        
+    def _dispatch_events(self):
+        """Handle queued events until the dispatcher is stopped."""
+        events = self._events
+        while self._dispatching:
+            events.wait()
+            events.drain()
+            
+        # Handle anything queued while stopping
+        events.drain()
+        
+    def _is_foreign_thread(self) -> bool:
+        """Check whether an event must be queued for the dispatch thread."""
+        dispatch_thread = self._dispatch_thread
+        return dispatch_thread is not None and threading.current_thread() is not dispatch_thread
         
     def on_data(self, data: Dict[str, Bar]):
         """
@@ -84,11 +181,71 @@ class TradingEngine:
         if not self._running:
             return
             
+        if self._is_foreign_thread():
+            self._events.put(self._handle_data, data)
+            return
+            
+        self._handle_data(data)
+        
+    def _handle_data(self, data: Dict[str, Bar]):
+        """
+        Process new market data.
+        
+        Args:
+            data: Dictionary mapping symbol to Bar object
+        """
+        # Process market data in execution provider
+        self._process_market_data(data)
+        
+        # Keep risk manager market values up to date
+        if self.risk_manager is not None:
+            self.risk_manager.on_data(data)
+            
+        # Forward data to strategy
+        self._strategy_on_data(data)
+        
+        # Submit any orders the strategy queued while handling the data
+        pending_orders = self.strategy.pop_pending_orders()
+        if pending_orders:
+            self.place_orders(pending_orders)
+        
+    def on_data_batch(self, batch: BarBatch):
+        """
+        Called when new market data is available in array form.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        if not self._running:
+            return
+            
+        if self._is_foreign_thread():
+            self._events.put(self._handle_data_batch, batch)
+            return
+            
+        self._handle_data_batch(batch)
+        
+    def _handle_data_batch(self, batch: BarBatch):
+        """
+        Process new market data in array form.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
         # Process market data in execution provider
-        self.execution_provider.process_market_data(data)
+        self._process_market_data_batch(batch)
         
+        # Keep risk manager market values up to date
+        if self.risk_manager is not None:
+            self.risk_manager.on_data_batch(batch)
+            
         # Forward data to strategy
-        self.strategy.on_data(data)
+        self._strategy_on_data_batch(batch)
+        
+        # Submit any orders the strategy queued while handling the data
+        pending_orders = self.strategy.pop_pending_orders()
+        if pending_orders:
+            self.place_orders(pending_orders)
         
     def on_order_update(self, order: Order):
         """
@@ -100,8 +257,12 @@ class TradingEngine:
         if not self._running:
             return
             
+        if self._is_foreign_thread():
+            self._events.put(self._strategy_on_order_update, order)
+            return
+            
         # Forward order update to strategy
-        self.strategy.on_order_update(order)
+        self._strategy_on_order_update(order)
         
     def on_trade(self, trade: Trade):
         """
@@ -113,8 +274,23 @@ class TradingEngine:
         if not self._running:
             return
             
-        # Forward trade to strategy
-        self.strategy.on_trade(trade)
+        if self._is_foreign_thread():
+            self._events.put(self._handle_trade, trade)
+            return
+            
+        self._handle_trade(trade)
+        
+    def _handle_trade(self, trade: Trade):
+        """
+        Process a trade.
+        
+        Args:
+            trade: Trade that occurred
+        """
+        # Update risk manager and forward trade to strategy
+        if self.risk_manager is not None:
+            self.risk_manager.on_trade(trade)
+        self._strategy_on_trade(trade)
         
     def place_order(self, symbol: str, side: OrderSide, quantity: float,
                    order_type: OrderType = OrderType.MARKET,
@@ -137,33 +313,71 @@ class TradingEngine:
             Order object if successful, None otherwise
         """
         if not self._running:
-            self.logger.error("Cannot place order: engine not running")
+            logger.error("Cannot place order: engine not running")
             return None
             
-        # Apply risk management if available
-        if self.risk_manager is not None:
-            approved, modified_params = self.risk_manager.check_order(
+        # Without a risk manager, go straight to the execution provider
+        if self.risk_manager is None:
+            return self.execution_provider.place_order(
                 symbol=symbol,
                 side=side,
                 quantity=quantity,
                 order_type=order_type,
                 price=price,
-                stop_price=stop_price
+                stop_price=stop_price,
+                time_in_force=time_in_force
             )
             
-            if not approved:
-                self.logger.warning(f"Order rejected by risk manager: {symbol} {side.name} {quantity}")
-                return None
-                
-            # Update parameters if modified
-            if modified_params:
-                symbol = modified_params.get('symbol', symbol)
-                side = modified_params.get('side', side)
-                quantity = modified_params.get('quantity', quantity)
-                order_type = modified_params.get('order_type', order_type)
-                price = modified_params.get('price', price)
-                stop_price = modified_params.get('stop_price', stop_price)
-                
+        return self._place_order_with_risk(symbol, side, quantity, order_type,
+                                           price, stop_price, time_in_force)
+        
+    def _place_order_with_risk(self, symbol: str, side: OrderSide, quantity: float,
+                               order_type: OrderType, price: Optional[float],
+                               stop_price: Optional[float],
+                               time_in_force: TimeInForce) -> Optional[Order]:
+        """
+        Check an order with the risk manager and place it if approved.
+        
+        Args:
+            symbol: Symbol to trade
+            side: Order side (BUY or SELL)
+            quantity: Quantity to trade
+            order_type: Type of order (MARKET, LIMIT, etc.)
+            price: Limit price
+            stop_price: Stop price
+            time_in_force: Time in force for the order
+            
+        Returns:
+            Order object if successful, None otherwise
+        """
+        approved, modification = self.risk_manager.check_order(
+            symbol=symbol,
+            side=side,
+            quantity=quantity,
+            order_type=order_type,
+            price=price,
+            stop_price=stop_price
+        )
+        
+        if not approved:
+            logger.warning("Order rejected by risk manager: %s %s %s", symbol, side.name, quantity)
+            return None
+            
+        # Update parameters if modified
+        if modification is not None:
+            if modification.symbol is not None:
+                symbol = modification.symbol
+            if modification.side is not None:
+                side = modification.side
+            if modification.quantity is not None:
+                quantity = modification.quantity
+            if modification.order_type is not None:
+                order_type = modification.order_type
+            if modification.price is not None:
+                price = modification.price
+            if modification.stop_price is not None:
+                stop_price = modification.stop_price
+            
         # Place order through execution provider
         return self.execution_provider.place_order(
             symbol=symbol,
@@ -175,6 +389,59 @@ class TradingEngine:
             time_in_force=time_in_force
         )
         
+    def place_orders(self, requests: List[OrderRequest]) -> List[Optional[Order]]:
+        """
+        Place a batch of orders.
+        
+        The batch is checked by the risk manager against a single portfolio
+        snapshot and handed to the execution provider in one call.
+        
+        Args:
+            requests: Order requests to place
+            
+        Returns:
+            List with an Order object (or None if rejected) for each request
+        """
+        results = [None] * len(requests)
+        if not self._running:
+            logger.error("Cannot place orders: engine not running")
+            return results
+            
+        indices = list(range(len(requests)))
+        
+        # Apply risk management if available
+        if self.risk_manager is not None:
+            checks = self.risk_manager.check_orders(requests)
+            approved_indices = []
+            approved_requests = []
+            for i, (approved, modification) in zip(indices, checks):
+                request = requests[i]
+                if not approved:
+                    logger.warning("Order rejected by risk manager: %s %s %s",
+                                   request.symbol, request.side.name, request.quantity)
+                    continue
+                    
+                # Update parameters if modified
+                if modification is not None:
+                    request = replace(request, **{
+                        field: value for field, value in modification._asdict().items()
+                        if value is not None
+                    })
+                    
+                approved_indices.append(i)
+                approved_requests.append(request)
+                
+            indices = approved_indices
+            requests = approved_requests
+            
+        # Place orders through execution provider
+        if requests:
+            orders = self.execution_provider.place_orders(requests)
+            for i, order in zip(indices, orders):
+                results[i] = order
+                
+        return results
+        
     def cancel_order(self, order_id: str) -> bool:
         """
         Cancel an order.
@@ -186,7 +453,7 @@ class TradingEngine:
             True if successful, False otherwise
         """
         if not self._running:
-            self.logger.error("Cannot cancel order: engine not running")
+            logger.error("Cannot cancel order: engine not running")
             return False
             
         return self.execution_provider.cancel_order(order_id)
@@ -257,23 +524,9 @@ class TradingEngine:
         Returns:
             DataFrame with historical data
         """
-        if not hasattr(self.data_provider, 'get_historical_data'):
-            self.logger.error("Data provider does not support historical data")
-            return None
-            
         # Convert period to start and end dates
         end_date = datetime.now()
-        if period.endswith('d'):
-            days = int(period[:-1])
-            start_date = end_date - timedelta(days=days)
-        elif period.endswith('m'):
-            months = int(period[:-1])
-            start_date = end_date - timedelta(days=months * 30)
-        elif period.endswith('y'):
-            years = int(period[:-1])
-            start_date = end_date - timedelta(days=years * 365)
-        else:
-            raise ValueError(f"Invalid period: {period}")
+        start_date = end_date - _parse_period(period)
             
         return self.data_provider.get_historical_data(symbol, start_date, end_date, interval)
         
@@ -287,70 +540,51 @@ class TradingEngine:
         Returns:
             Latest Bar object for the symbol, or None if not available
         """
-        if hasattr(self.data_provider, '_data') and symbol in self.data_provider._data:
-            df = self.data_provider._data[symbol]
-            if not df.empty:
-                # Get the latest row
-                row = df.iloc[-1]
-                return Bar(
-                    timestamp=row[self.data_provider.timestamp_column],
-                    open=row[self.data_provider.ohlcv_columns['open']],
-                    high=row[self.data_provider.ohlcv_columns['high']],
-                    low=row[self.data_provider.ohlcv_columns['low']],
-                    close=row[self.data_provider.ohlcv_columns['close']],
-                    volume=row[self.data_provider.ohlcv_columns['volume']]
-                )
-        return None
+        return self.data_provider.get_last_bar(symbol)
         
     def run_backtest(self):
         """Run a backtest."""
-        self.logger.debug("Starting backtest")
+        logger.debug("Starting backtest")
         
         # Check if data provider has data
-        if hasattr(self.data_provider, '_data'):
-            self.logger.debug(f"Data provider has {len(self.data_provider._data)} symbols loaded")
-            for symbol, df in self.data_provider._data.items():
-                self.logger.debug(f"Symbol {symbol} has {len(df)} data points")
-        else:
-            self.logger.warning("Data provider does not have _data attribute")
+        data_stats = self.data_provider.snapshot_data_stats()
+        logger.debug(f"Data provider has {len(data_stats)} symbols loaded")
+        for symbol, count in data_stats.items():
+            logger.debug(f"Symbol {symbol} has {count} data points")
             
         # Make sure data provider is not already running
-        if hasattr(self.data_provider, '_running') and self.data_provider._running:
-            self.logger.warning("Data provider is already running, stopping it first")
+        if self.data_provider.is_running():
+            logger.warning("Data provider is already running, stopping it first")
             self.data_provider.stop()
             
             # Wait for thread to finish
-            if hasattr(self.data_provider, '_thread') and self.data_provider._thread:
-                self.data_provider._thread.join(timeout=1)
+            thread = self.data_provider.running_thread()
+            if thread is not None:
+                thread.join(timeout=1)
                 
         # Reset data provider indices
-        if hasattr(self.data_provider, '_current_index'):
-            for symbol in self.data_provider._current_index:
-                self.data_provider._current_index[symbol] = 0
+        self.data_provider.reset_indices()
                 
         self.start()
         
         # Wait for the data provider to finish
-        if hasattr(self.data_provider, '_thread') and self.data_provider._thread:
-            self.logger.debug("Waiting for data provider thread to finish")
+        thread = self.data_provider.running_thread()
+        if thread is not None:
+            logger.debug("Waiting for data provider thread to finish")
             
-            # Wait in small increments to allow for keyboard interrupts
-            start_time = datetime.now()
             timeout = 30  # 30 seconds timeout
+            thread.join(timeout=timeout)
             
-            while self.data_provider._thread.is_alive():
-                self.data_provider._thread.join(timeout=0.5)  # Wait for 0.5 seconds
-                
-                # Check if we've exceeded the timeout
-                elapsed = (datetime.now() - start_time).total_seconds()
-                if elapsed > timeout:
-                    self.logger.warning(f"Data provider thread did not finish within {timeout} seconds timeout")
-                    self.data_provider._running = False  # Force stop
-                    break
-                    
-            self.logger.debug("Data provider thread finished")
+            if thread.is_alive():
+                logger.warning(f"Data provider thread did not finish within {timeout} seconds timeout")
+                self.data_provider.stop()  # Force stop
+            else:
+                logger.debug("Data provider thread finished")
         else:
-            self.logger.warning("Data provider does not have a thread or thread is not running")
+            logger.warning("Data provider does not have a thread or thread is not running")
+            
+        # Handle any events still queued for the dispatch thread
+        self._stop_dispatcher()
         
     def get_performance_metrics(self) -> Dict[str, Any]:
         """
@@ -362,5 +596,5 @@ class TradingEngine:
         if hasattr(self.execution_provider, 'get_performance_metrics'):
             return self.execution_provider.get_performance_metrics()
         else:
-            self.logger.warning("Execution provider does not support performance metrics")
+            logger.warning("Execution provider does not support performance metrics")
             return {} 
\ No newline at end of file
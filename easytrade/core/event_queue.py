@@ -0,0 +1,80 @@
+"""
+Event queue used to hand events from provider threads to the engine's dispatch thread.
+"""
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueue:
+    """
+    Single-consumer queue of (handler, payload) events.
+    
+    Producers append to a deque, whose append and popleft are atomic in CPython,
+    so no lock is taken on the hot path. A threading.Event wakes the consumer
+    when new events arrive.
+    """
+    
+    __slots__ = ('_events', '_ready')
+    
+    def __init__(self):
+        """Initialize the event queue."""
+        self._events = deque()
+        self._ready = threading.Event()
+        
+    def __len__(self) -> int:
+        """Number of events waiting to be processed."""
+        return len(self._events)
+        
+    def put(self, handler: Callable[[Any], None], payload: Any):
+        """
+        Add an event to the queue.
+        
+        Args:
+            handler: Function to call with the payload
+            payload: Event payload
+        """
+        self._events.append((handler, payload))
+        self._ready.set()
+        
+    def wake(self):
+        """Wake up the consumer without adding an event."""
+        self._ready.set()
+        
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until events are available or the consumer is woken up.
+        
+        Args:
+            timeout: Maximum time to wait in seconds (optional)
+        
+        Returns:
+            True if woken up, False if the timeout expired
+        """
+        return self._ready.wait(timeout)
+        
+    def drain(self) -> int:
+        """
+        Process all queued events in order.
+        
+        An exception raised by a handler is logged and does not stop the
+        remaining events from being processed.
+        
+        Returns:
+            Number of events processed
+        """
+        self._ready.clear()
+        events = self._events
+        count = 0
+        while events:
+            handler, payload = events.popleft()
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Error handling queued event in %s", getattr(handler, '__qualname__', handler))
+            count += 1
+        return count
+        
\ No newline at end of file
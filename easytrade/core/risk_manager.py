@@ -5,7 +5,12 @@ import logging
 from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime, timedelta
 
-from easytrade.core.types import OrderType, OrderSide, Position, Portfolio
+from easytrade.core.types import OrderModification, OrderRequest, OrderType, OrderSide, Position, Portfolio, Trade, Bar, BarBatch
+from easytrade.core._risk_kernels import (
+    evaluate_limits, LIMIT_MODIFIED, LIMIT_REJECTED_POSITION, LIMIT_REJECTED_CONCENTRATION
+)
+
+logger = logging.getLogger(__name__)
 
 
 class RiskManager:
@@ -16,6 +21,11 @@ class RiskManager:
     excessive risk-taking by strategies.
     """
     
+    __slots__ = (
+        'max_position_size', 'max_order_size', 'max_concentration', 'max_drawdown',
+        '_engine', '_initial_equity', '_peak_equity', '_cached_position_mv', '_cached_total_mv'
+    )
+    
     def __init__(self, max_position_size: float = 0.1, max_order_size: float = 0.05,
                 max_concentration: float = 0.25, max_drawdown: float = 0.1):
         """
@@ -27,7 +37,6 @@ class RiskManager:
             max_concentration: Maximum concentration in a single symbol
             max_drawdown: Maximum allowed drawdown before stopping trading
         """
-        self.logger = logging.getLogger(self.__class__.__name__)
         self.max_position_size = max_position_size
         self.max_order_size = max_order_size
         self.max_concentration = max_concentration
@@ -37,6 +46,10 @@ class RiskManager:
         self._initial_equity = None
         self._peak_equity = None
         
+        # Running market values, kept up to date from data and trade updates
+        self._cached_position_mv = {}  # symbol -> market value
+        self._cached_total_mv = 0.0
+        
     def set_engine(self, engine):
         """
         Set the trading engine reference.
@@ -46,9 +59,57 @@ class RiskManager:
         """
         self._engine = engine
         
+    def on_data(self, data: Dict[str, Bar]):
+        """
+        Update cached market values after new market data has been processed.
+        
+        Args:
+            data: Dictionary mapping symbol to Bar object
+        """
+        for symbol in data:
+            self._update_position_value(symbol)
+            
+    def on_data_batch(self, batch: BarBatch):
+        """
+        Update cached market values after new market data in array form has been processed.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        for symbol in batch.symbols.tolist():
+            self._update_position_value(symbol)
+            
+    def on_trade(self, trade: Trade):
+        """
+        Update cached market values after a trade.
+        
+        Args:
+            trade: Trade that occurred
+        """
+        self._update_position_value(trade.symbol)
+        
+    def _update_position_value(self, symbol: str):
+        """
+        Refresh the cached market value of a single position.
+        
+        Args:
+            symbol: Symbol to refresh
+        """
+        if self._engine is None:
+            return
+            
+        position = self._engine.get_position(symbol)
+        market_value = position.market_value if position is not None else None
+        if market_value is None:
+            market_value = 0.0
+            
+        old_value = self._cached_position_mv.get(symbol, 0.0)
+        self._cached_position_mv[symbol] = market_value
+        self._cached_total_mv += market_value - old_value
+        
     def check_order(self, symbol: str, side: OrderSide, quantity: float,
                    order_type: OrderType, price: Optional[float] = None,
-                   stop_price: Optional[float] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+                   stop_price: Optional[float] = None) -> Tuple[bool, Optional[OrderModification]]:
         """
         Check if an order complies with risk limits.
         
@@ -61,31 +122,93 @@ class RiskManager:
             stop_price: Stop price (required for STOP and STOP_LIMIT orders)
             
         Returns:
-            Tuple of (approved, modified_params)
+            Tuple of (approved, modification)
             - approved: True if order is approved, False otherwise
-            - modified_params: Modified order parameters if any, None otherwise
+            - modification: OrderModification with the changed parameters if any, None otherwise
         """
         if self._engine is None:
-            self.logger.error("Cannot check order: engine not set")
+            logger.error("Cannot check order: engine not set")
             return False, None
             
         # Get current portfolio
         portfolio = self._engine.get_portfolio()
         
+        if not self._check_drawdown(portfolio.equity):
+            return False, None
+            
+        return self._check_limits(portfolio.equity, symbol, side, quantity, price, stop_price)
+        
+    def check_orders(self, requests: List[OrderRequest]) -> List[Tuple[bool, Optional[OrderModification]]]:
+        """
+        Check a batch of orders against risk limits using a single portfolio snapshot.
+        
+        Args:
+            requests: Order requests to check
+            
+        Returns:
+            List of (approved, modification) tuples, one per request,
+            as returned by check_order
+        """
+        if self._engine is None:
+            logger.error("Cannot check orders: engine not set")
+            return [(False, None)] * len(requests)
+            
+        # Get current portfolio
+        portfolio = self._engine.get_portfolio()
+        
+        if not self._check_drawdown(portfolio.equity):
+            return [(False, None)] * len(requests)
+            
+        return [
+            self._check_limits(portfolio.equity, request.symbol, request.side,
+                               request.quantity, request.price, request.stop_price)
+            for request in requests
+        ]
+        
+    def _check_drawdown(self, equity: float) -> bool:
+        """
+        Update equity tracking and check the drawdown limit.
+        
+        Args:
+            equity: Current portfolio equity
+            
+        Returns:
+            True if trading is allowed, False if the drawdown limit is exceeded
+        """
         # Initialize equity tracking
         if self._initial_equity is None:
-            self._initial_equity = portfolio.equity
-            self._peak_equity = portfolio.equity
+            self._initial_equity = equity
+            self._peak_equity = equity
         else:
-            self._peak_equity = max(self._peak_equity, portfolio.equity)
+            self._peak_equity = max(self._peak_equity, equity)
             
         # Check for drawdown
         if self._peak_equity > 0:
-            drawdown = (self._peak_equity - portfolio.equity) / self._peak_equity
+            drawdown = (self._peak_equity - equity) / self._peak_equity
             if drawdown > self.max_drawdown:
-                self.logger.warning(f"Order rejected: drawdown {drawdown:.2%} exceeds limit {self.max_drawdown:.2%}")
-                return False, None
+                logger.warning("Order rejected: drawdown %.2f%% exceeds limit %.2f%%",
+                               drawdown * 100, self.max_drawdown * 100)
+                return False
                 
+        return True
+        
+    def _check_limits(self, equity: float, symbol: str, side: OrderSide, quantity: float,
+                      price: Optional[float] = None,
+                      stop_price: Optional[float] = None) -> Tuple[bool, Optional[OrderModification]]:
+        """
+        Check an order against the order size, position size and concentration limits.
+        
+        Args:
+            equity: Current portfolio equity
+            symbol: Symbol to trade
+            side: Order side (BUY or SELL)
+            quantity: Quantity to trade
+            price: Limit price
+            stop_price: Stop price
+            
+        Returns:
+            Tuple of (approved, modification), as returned by check_order
+        """
         # Get current position
         position = self._engine.get_position(symbol)
         
@@ -97,82 +220,33 @@ class RiskManager:
                 order_price = position.current_price
             else:
                 # Cannot determine order value, reject
-                self.logger.warning(f"Order rejected: cannot determine order value for {symbol}")
+                logger.warning("Order rejected: cannot determine order value for %s", symbol)
                 return False, None
                 
-        order_value = quantity * order_price
-        
-        # Check order size
-        if portfolio.equity > 0:
-            order_size_ratio = order_value / portfolio.equity
-            if order_size_ratio > self.max_order_size:
-                # Reduce order size to comply with limit
-                modified_quantity = (self.max_order_size * portfolio.equity) / order_price
-                self.logger.warning(f"Order size reduced: {quantity} -> {modified_quantity:.2f} {symbol}")
-                return True, {'quantity': modified_quantity}
-                
-        # Check position size (for buys)
-        if side == OrderSide.BUY and portfolio.equity > 0:
-            # Calculate new position value
-            if position is not None:
-                new_position_value = position.market_value + order_value
-            else:
-                new_position_value = order_value
-                
-            position_size_ratio = new_position_value / portfolio.equity
-            if position_size_ratio > self.max_position_size:
-                # Reduce order size to comply with limit
-                if position is not None and position.market_value > 0:
-                    max_additional = (self.max_position_size * portfolio.equity) - position.market_value
-                    if max_additional <= 0:
-                        self.logger.warning(f"Order rejected: position size for {symbol} already at limit")
-                        return False, None
-                        
-                    modified_quantity = max_additional / order_price
-                    self.logger.warning(f"Order size reduced: {quantity} -> {modified_quantity:.2f} {symbol}")
-                    return True, {'quantity': modified_quantity}
-                else:
-                    modified_quantity = (self.max_position_size * portfolio.equity) / order_price
-                    self.logger.warning(f"Order size reduced: {quantity} -> {modified_quantity:.2f} {symbol}")
-                    return True, {'quantity': modified_quantity}
-                    
-        # Check portfolio concentration
-        if side == OrderSide.BUY and portfolio.equity > 0:
-            # Calculate total position value
-            total_position_value = sum(
-                pos.market_value or 0 
-                for pos in portfolio.positions.values() 
-                if pos.market_value is not None
-            )
-            
-            # Calculate new position value
-            if position is not None:
-                new_position_value = position.market_value + order_value
-            else:
-                new_position_value = order_value
-                
-            # Calculate new total position value
-            new_total_position_value = total_position_value + order_value
-            
-            # Calculate concentration
-            if new_total_position_value > 0:
-                concentration = new_position_value / new_total_position_value
-                if concentration > self.max_concentration:
-                    # Reduce order size to comply with limit
-                    max_position_value = self.max_concentration * (new_total_position_value - new_position_value) / (1 - self.max_concentration)
-                    if position is not None and position.market_value > 0:
-                        max_additional = max_position_value - position.market_value
-                        if max_additional <= 0:
-                            self.logger.warning(f"Order rejected: concentration for {symbol} already at limit")
-                            return False, None
-                            
-                        modified_quantity = max_additional / order_price
-                        self.logger.warning(f"Order size reduced: {quantity} -> {modified_quantity:.2f} {symbol}")
-                        return True, {'quantity': modified_quantity}
-                    else:
-                        modified_quantity = max_position_value / order_price
-                        self.logger.warning(f"Order size reduced: {quantity} -> {modified_quantity:.2f} {symbol}")
-                        return True, {'quantity': modified_quantity}
+        # Market value of the existing position
+        current_position_value = 0.0
+        if position is not None and position.market_value is not None:
+            current_position_value = position.market_value
+            
+        # Check order size, position size and concentration limits
+        status, modified_quantity = evaluate_limits(
+            equity, quantity, order_price,
+            current_position_value, self._cached_total_mv,
+            side == OrderSide.BUY, self.max_order_size,
+            self.max_position_size, self.max_concentration
+        )
+        
+        if status == LIMIT_REJECTED_POSITION:
+            logger.warning("Order rejected: position size for %s already at limit", symbol)
+            return False, None
+            
+        if status == LIMIT_REJECTED_CONCENTRATION:
+            logger.warning("Order rejected: concentration for %s already at limit", symbol)
+            return False, None
+            
+        if status == LIMIT_MODIFIED:
+            logger.warning("Order size reduced: %s -> %.2f %s", quantity, modified_quantity, symbol)
+            return True, OrderModification(quantity=modified_quantity)
                         
         # Order is approved
         return True, None 
\ No newline at end of file
@@ -6,7 +6,7 @@ from typing import Dict, Any, Optional, List, Union
 import logging
 from datetime import datetime
 
-from easytrade.core.types import Bar, Order, OrderType, OrderSide, TimeInForce
+from easytrade.core.types import Bar, BarBatch, Order, OrderRequest, OrderType, OrderSide, TimeInForce
 
 
 class Strategy(ABC):
@@ -17,12 +17,18 @@ class Strategy(ABC):
     communication with the trading engine.
     """
     
+    # Subclasses that don't declare __slots__ still get a __dict__ for their own attributes
+    __slots__ = (
+        'logger', '_engine', '_symbols', '_parameters', '_pending_orders'
+    )
+    
     def __init__(self):
         """Initialize the strategy."""
         self.logger = logging.getLogger(f"{self.__class__.__name__}")
         self._engine = None
         self._symbols = []
         self._parameters = {}
+        self._pending_orders = []  # OrderRequests queued for batch submission
         
     def set_engine(self, engine):
         """Set the trading engine reference."""
@@ -46,6 +52,18 @@ class Strategy(ABC):
         """
         pass
     
+    def on_data_batch(self, batch: BarBatch):
+        """
+        Called when new market data arrives as a BarBatch.
+        
+        Strategies that work on arrays can override this to avoid building a
+        Bar per symbol; the default converts the batch and calls on_data.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        self.on_data(batch.to_bars())
+    
     def on_order_update(self, order: Order):
         """
         Called when an order status is updated.
@@ -134,6 +152,46 @@ class Strategy(ABC):
             time_in_force=time_in_force
         )
     
+    def queue_order(self, symbol: str, side: OrderSide, quantity: float,
+                    order_type: OrderType = OrderType.MARKET,
+                    price: Optional[float] = None, stop_price: Optional[float] = None,
+                    time_in_force: TimeInForce = TimeInForce.DAY):
+        """
+        Queue an order to be placed in a batch after on_data returns.
+        
+        Queued orders go through a single risk check and execution round trip,
+        which is cheaper than calling buy/sell for each order.
+        
+        Args:
+            symbol: Symbol to trade
+            side: Order side (BUY or SELL)
+            quantity: Quantity to trade
+            order_type: Type of order (MARKET, LIMIT, etc.)
+            price: Limit price (required for LIMIT and STOP_LIMIT orders)
+            stop_price: Stop price (required for STOP and STOP_LIMIT orders)
+            time_in_force: Time in force for the order
+        """
+        self._pending_orders.append(OrderRequest(
+            symbol=symbol,
+            side=side,
+            quantity=quantity,
+            order_type=order_type,
+            price=price,
+            stop_price=stop_price,
+            time_in_force=time_in_force
+        ))
+        
+    def pop_pending_orders(self) -> List[OrderRequest]:
+        """
+        Remove and return all queued order requests.
+        
+        Returns:
+            List of OrderRequest objects
+        """
+        pending = self._pending_orders
+        self._pending_orders = []
+        return pending
+    
     def close(self, symbol: str) -> Optional[Order]:
         """
         Close an existing position.
@@ -1,13 +1,15 @@
 """
 Common data types and enums used throughout the framework.
 """
-from enum import Enum, auto
+from enum import IntEnum, auto
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Union, Tuple
+from typing import Dict, Any, Optional, List, Union, Tuple, NamedTuple
 
+import numpy as np
 
-class OrderType(Enum):
+
+class OrderType(IntEnum):
     """Types of orders that can be placed."""
     MARKET = auto()
     LIMIT = auto()
@@ -15,13 +17,13 @@ class OrderType(Enum):
     STOP_LIMIT = auto()
 
 
-class OrderSide(Enum):
+class OrderSide(IntEnum):
     """Side of an order (buy or sell)."""
     BUY = auto()
     SELL = auto()
 
 
-class OrderStatus(Enum):
+class OrderStatus(IntEnum):
     """Status of an order."""
     CREATED = auto()
     SUBMITTED = auto()
@@ -33,7 +35,7 @@ class OrderStatus(Enum):
     EXPIRED = auto()
 
 
-class TimeInForce(Enum):
+class TimeInForce(IntEnum):
     """Time in force for an order."""
     DAY = auto()
     GTC = auto()  # Good Till Canceled
@@ -41,7 +43,14 @@ class TimeInForce(Enum):
     FOK = auto()  # Fill or Kill
 
 
-@dataclass
+# Member -> name lookups used by the to_dict methods
+_ORDER_TYPE_NAMES = {member: member.name for member in OrderType}
+_ORDER_SIDE_NAMES = {member: member.name for member in OrderSide}
+_ORDER_STATUS_NAMES = {member: member.name for member in OrderStatus}
+_TIME_IN_FORCE_NAMES = {member: member.name for member in TimeInForce}
+
+
+@dataclass(slots=True)
 class Bar:
     """Represents OHLCV data for a single time period."""
     timestamp: datetime
@@ -62,6 +71,10 @@ class Bar:
             'volume': self.volume
         }
     
+    def to_tuple(self) -> Tuple[datetime, float, float, float, float, float]:
+        """Convert Bar to a (timestamp, open, high, low, close, volume) tuple."""
+        return (self.timestamp, self.open, self.high, self.low, self.close, self.volume)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Bar':
         """Create Bar from dictionary."""
@@ -75,7 +88,123 @@ class Bar:
         )
 
 
+class BarView:
+    """
+    Read-only view of one bar stored in a row of an OHLCV matrix.
+    
+    Creating a view only stores references; fields are read from the matrix
+    when accessed. It has the same fields as Bar and can be used wherever a
+    Bar is only read.
+    """
+    
+    __slots__ = ('_timestamps', '_ohlcv', '_index')
+    
+    def __init__(self, timestamps: np.ndarray, ohlcv: np.ndarray, index: int):
+        """
+        Initialize the view.
+        
+        Args:
+            timestamps: Timestamps, one per row of ohlcv
+            ohlcv: Matrix with one (open, high, low, close, volume) row per timestamp
+            index: Row of the bar
+        """
+        self._timestamps = timestamps
+        self._ohlcv = ohlcv
+        self._index = index
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Start of the bar period."""
+        return self._timestamps[self._index]
+    
+    @property
+    def open(self) -> float:
+        """Opening price."""
+        return self._ohlcv.item(self._index, 0)
+    
+    @property
+    def high(self) -> float:
+        """Highest price."""
+        return self._ohlcv.item(self._index, 1)
+    
+    @property
+    def low(self) -> float:
+        """Lowest price."""
+        return self._ohlcv.item(self._index, 2)
+    
+    @property
+    def close(self) -> float:
+        """Closing price."""
+        return self._ohlcv.item(self._index, 3)
+    
+    @property
+    def volume(self) -> float:
+        """Traded volume."""
+        return self._ohlcv.item(self._index, 4)
+    
+    def __repr__(self) -> str:
+        """Represent BarView with its field values."""
+        return f"BarView{self.to_tuple()!r}"
+    
+    def to_bar(self) -> Bar:
+        """Convert BarView to a Bar."""
+        return Bar(*self.to_tuple())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert BarView to dictionary."""
+        return self.to_bar().to_dict()
+    
+    def to_tuple(self) -> Tuple[datetime, float, float, float, float, float]:
+        """Convert BarView to a (timestamp, open, high, low, close, volume) tuple."""
+        return (self._timestamps[self._index], *self._ohlcv[self._index].tolist())
+
+
 @dataclass
+class BarBatch:
+    """
+    OHLCV data for several symbols at the same time step, stored as arrays.
+    
+    Element i of each array belongs to symbols[i].
+    """
+    symbols: np.ndarray
+    timestamps: np.ndarray
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+    
+    def __len__(self) -> int:
+        """Number of symbols in the batch."""
+        return len(self.symbols)
+    
+    def to_bars(self) -> Dict[str, Bar]:
+        """Convert BarBatch to a dictionary mapping symbol to Bar."""
+        return {
+            symbol: Bar(timestamp, open_, high, low, close, volume)
+            for symbol, timestamp, open_, high, low, close, volume in zip(
+                self.symbols.tolist(), self.timestamps, self.opens.tolist(),
+                self.highs.tolist(), self.lows.tolist(), self.closes.tolist(),
+                self.volumes.tolist()
+            )
+        }
+    
+    @classmethod
+    def from_bars(cls, data: Dict[str, Bar]) -> 'BarBatch':
+        """Create BarBatch from a dictionary mapping symbol to Bar."""
+        bars = list(data.values())
+        return cls(
+            symbols=np.array(list(data.keys()), dtype=object),
+            timestamps=np.array([bar.timestamp for bar in bars], dtype=object),
+            opens=np.array([bar.open for bar in bars], dtype=np.float64),
+            highs=np.array([bar.high for bar in bars], dtype=np.float64),
+            lows=np.array([bar.low for bar in bars], dtype=np.float64),
+            closes=np.array([bar.close for bar in bars], dtype=np.float64),
+            volumes=np.array([bar.volume for bar in bars], dtype=np.float64)
+        )
+
+
+@dataclass(slots=True)
 class Order:
     """Represents a trading order."""
     id: Optional[str] = None
@@ -97,13 +226,13 @@ class Order:
         return {
             'id': self.id,
             'symbol': self.symbol,
-            'order_type': self.order_type.name,
-            'side': self.side.name,
+            'order_type': _ORDER_TYPE_NAMES[self.order_type],
+            'side': _ORDER_SIDE_NAMES[self.side],
             'quantity': self.quantity,
             'price': self.price,
             'stop_price': self.stop_price,
-            'time_in_force': self.time_in_force.name,
-            'status': self.status.name,
+            'time_in_force': _TIME_IN_FORCE_NAMES[self.time_in_force],
+            'status': _ORDER_STATUS_NAMES[self.status],
             'filled_quantity': self.filled_quantity,
             'average_fill_price': self.average_fill_price,
             'created_at': self.created_at,
@@ -112,6 +241,28 @@ class Order:
 
 
 @dataclass
+class OrderRequest:
+    """Represents a request to place an order, queued for batch submission."""
+    symbol: str
+    side: OrderSide
+    quantity: float
+    order_type: OrderType = OrderType.MARKET
+    price: Optional[float] = None
+    stop_price: Optional[float] = None
+    time_in_force: TimeInForce = TimeInForce.DAY
+
+
+class OrderModification(NamedTuple):
+    """Order parameters changed by a risk check; None means unchanged."""
+    symbol: Optional[str] = None
+    side: Optional[OrderSide] = None
+    quantity: Optional[float] = None
+    order_type: Optional[OrderType] = None
+    price: Optional[float] = None
+    stop_price: Optional[float] = None
+
+
+@dataclass(slots=True)
 class Position:
     """Represents a trading position."""
     symbol: str
@@ -140,20 +291,43 @@ class Position:
             return ((self.current_price / self.average_entry_price) - 1) * 100
         return None
     
+    def valuation(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """
+        Calculate the market value, unrealized profit/loss and unrealized profit/loss
+        percentage in one call.
+        
+        Returns:
+            Tuple of (market_value, unrealized_pnl, unrealized_pnl_percent), with the
+            same values as the corresponding properties
+        """
+        current_price = self.current_price
+        if current_price is None:
+            return None, None, None
+            
+        quantity = self.quantity
+        average_entry_price = self.average_entry_price
+        pnl_percent = ((current_price / average_entry_price) - 1) * 100 if average_entry_price != 0 else None
+        return quantity * current_price, quantity * (current_price - average_entry_price), pnl_percent
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert Position to dictionary."""
+        market_value, unrealized_pnl, unrealized_pnl_percent = self.valuation()
         return {
             'symbol': self.symbol,
             'quantity': self.quantity,
             'average_entry_price': self.average_entry_price,
             'current_price': self.current_price,
-            'market_value': self.market_value,
-            'unrealized_pnl': self.unrealized_pnl,
-            'unrealized_pnl_percent': self.unrealized_pnl_percent
+            'market_value': market_value,
+            'unrealized_pnl': unrealized_pnl,
+            'unrealized_pnl_percent': unrealized_pnl_percent
         }
+    
+    def to_tuple(self) -> Tuple[str, float, float, Optional[float]]:
+        """Convert Position to a (symbol, quantity, average_entry_price, current_price) tuple."""
+        return (self.symbol, self.quantity, self.average_entry_price, self.current_price)
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Represents a completed trade."""
     symbol: str
@@ -167,29 +341,38 @@ class Trade:
         """Convert Trade to dictionary."""
         return {
             'symbol': self.symbol,
-            'side': self.side.name,
+            'side': _ORDER_SIDE_NAMES[self.side],
             'quantity': self.quantity,
             'price': self.price,
             'timestamp': self.timestamp,
             'order_id': self.order_id
         }
+    
+    def to_tuple(self) -> Tuple[str, OrderSide, float, float, datetime, str]:
+        """Convert Trade to a (symbol, side, quantity, price, timestamp, order_id) tuple."""
+        return (self.symbol, self.side, self.quantity, self.price, self.timestamp, self.order_id)
 
 
-@dataclass
+@dataclass(slots=True)
 class Portfolio:
     """Represents a portfolio of positions and cash."""
     cash: float
     positions: Dict[str, Position]
+    position_value: Optional[float] = None  # Total market value of positions, summed if not given
+    
+    def __post_init__(self):
+        # A portfolio is a snapshot, so the position value only needs summing once
+        if self.position_value is None:
+            self.position_value = sum(
+                pos.quantity * pos.current_price
+                for pos in self.positions.values()
+                if pos.current_price is not None
+            )
     
     @property
     def equity(self) -> float:
         """Calculate the total equity (cash + position values)."""
-        position_value = sum(
-            pos.market_value or 0 
-            for pos in self.positions.values() 
-            if pos.market_value is not None
-        )
-        return self.cash + position_value
+        return self.cash + self.position_value
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert Portfolio to dictionary."""
@@ -2,15 +2,38 @@
 CSV data provider for loading historical OHLCV data from CSV files.
 """
 import os
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Sequence, Union, Any
 from datetime import datetime, timedelta
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from easytrade.data.data_provider import DataProvider
-from easytrade.core.types import Bar
+from easytrade.data.data_provider import DataProvider, _copy_to_out
+from easytrade.core.types import Bar, BarView
+
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:  # PyArrow is an optional dependency
+    _HAVE_PYARROW = False
+    
+_CSV_ENGINE = 'pyarrow' if _HAVE_PYARROW else 'c'
+
+# Suffix of the parsed-data cache files written next to the CSV files
+_CACHE_SUFFIX = '.feather'
+
+# Parse timestamp strings through a cache of distinct values when at most
+# this fraction of them is unique
+_TIMESTAMP_CACHE_MAX_UNIQUE_RATIO = 0.8
+
+# Order of the fields in each row of the OHLCV matrix, matching the Bar fields
+_OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Relative error above which downcasting OHLCV values is reported
+_DOWNCAST_MAX_RELATIVE_ERROR = 1e-6
 
 
 class CSVDataProvider(DataProvider):
@@ -23,7 +46,11 @@ class CSVDataProvider(DataProvider):
     
     def __init__(self, data_dir: str, date_format: str = '%Y-%m-%d %H:%M:%S.%f',
                  timestamp_column: str = 'timestamp',
-                 ohlcv_columns: Dict[str, str] = None):
+                 ohlcv_columns: Dict[str, str] = None,
+                 dtype: Any = np.float64,
+                 reuse_bars: bool = False,
+                 cache_files: bool = False,
+                 use_views: bool = False):
         """
         Initialize the CSV data provider.
         
@@ -32,12 +59,31 @@ class CSVDataProvider(DataProvider):
             date_format: Format of date strings in CSV files
             timestamp_column: Name of timestamp column in CSV files
             ohlcv_columns: Dictionary mapping OHLCV column names to CSV column names
+            dtype: Floating point type used to store OHLCV values in memory; np.float32
+                halves memory use when the prices do not need double precision
+            reuse_bars: Reuse the same Bar objects and dictionary for every replayed
+                time step instead of allocating new ones. Subscribers must then treat
+                the data as valid only for the duration of the callback, so this cannot
+                be used with strategies that keep bars or with threaded dispatch.
+            cache_files: Save parsed data next to each CSV file in Feather format and
+                load it from there on later runs while it is newer than the CSV file.
+                Requires pyarrow.
+            use_views: Replay BarView objects that read fields from the loaded arrays
+                on access, instead of building a Bar for every symbol on every time step.
+                Ignored when reuse_bars is set.
         """
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.data_dir = data_dir
         self.date_format = date_format
         self.timestamp_column = timestamp_column
+        self.dtype = np.dtype(dtype)
+        self.reuse_bars = reuse_bars
+        self.cache_files = cache_files
+        self.use_views = use_views
+        
+        if cache_files and not _HAVE_PYARROW:
+            self.logger.warning("pyarrow is not installed, parsed CSV data will not be cached")
         
         # Default OHLCV column mappings
         self.ohlcv_columns = {
@@ -55,8 +101,12 @@ class CSVDataProvider(DataProvider):
         self._current_index = {}  # Symbol -> current index in DataFrame
         self._running = False
         self._thread = None
+        self._stop_event = threading.Event()  # Set to interrupt the replay sleep on stop
         self._replay_speed = 1.0  # Speed multiplier for replaying data
         self._replay_interval = 1.0  # Seconds between data updates
+        self._columns = {}  # Symbol -> (timestamps, OHLCV matrix) arrays
+        self._timestamps_ns = {}  # Symbol -> sorted int64 nanosecond timestamps
+        self._symbols = ()  # Cached tuple of loaded symbols
         
     def load_csv_file(self, file_path: str, symbol: str = None) -> bool:
         """
@@ -69,37 +119,190 @@ class CSVDataProvider(DataProvider):
         Returns:
             True if successful, False otherwise
         """
+        if symbol is None:
+            symbol = os.path.splitext(os.path.basename(file_path))[0]
+            
+        loaded = self._read_csv_file(file_path, symbol)
+        if loaded is None:
+            return False
+            
+        self._store_data(symbol, *loaded)
+        return True
+        
+    def _read_csv_file(self, file_path: str, symbol: str) -> Optional[tuple]:
+        """
+        Read and parse a CSV file without storing it.
+        
+        Args:
+            file_path: Path to CSV file
+            symbol: Symbol associated with this data
+            
+        Returns:
+            Tuple of (DataFrame, column arrays, nanosecond timestamps) if successful, None otherwise
+        """
         try:
-            if symbol is None:
-                symbol = os.path.splitext(os.path.basename(file_path))[0]
-                
-            df = pd.read_csv(file_path)
-            self.logger.debug(f"Loaded CSV file {file_path} with {len(df)} rows")
-            
-            # Try to convert timestamp column to datetime with specified format
-            try:
-                df[self.timestamp_column] = pd.to_datetime(df[self.timestamp_column], format=self.date_format)
-                self.logger.debug(f"Successfully parsed dates with format {self.date_format}")
-            except ValueError:
-                # If that fails, try with a more flexible approach
-                self.logger.warning(f"Failed to parse dates with format {self.date_format}, trying flexible parsing")
-                df[self.timestamp_column] = pd.to_datetime(df[self.timestamp_column])
-                self.logger.debug(f"Successfully parsed dates with flexible parsing")
-            
-            # Sort by timestamp
-            df = df.sort_values(by=self.timestamp_column)
-            
-            # Store data
-            self._data[symbol] = df
-            self._current_index[symbol] = 0
+            cache_path = file_path + _CACHE_SUFFIX
+            use_cache = self.cache_files and _HAVE_PYARROW
+            
+            if (use_cache and os.path.exists(cache_path)
+                    and os.path.getmtime(cache_path) >= os.path.getmtime(file_path)):
+                # Already parsed and sorted on an earlier run
+                df = pd.read_feather(cache_path)
+                self.logger.debug(f"Loaded cached data for {file_path} from {cache_path}")
+            else:
+                df = self._parse_csv_file(file_path)
+                if use_cache:
+                    self._write_cache(df, cache_path)
+            
+            timestamps_ns = df[self.timestamp_column].to_numpy(dtype='datetime64[ns]').view(np.int64)
             
             self.logger.info(f"Loaded {len(df)} rows for {symbol} from {file_path}")
-            return True
+            return df, self._extract_columns(df), timestamps_ns
             
         except Exception as e:
             self.logger.error(f"Error loading CSV file {file_path}: {e}")
-            return False
+            return None
+            
+    def _parse_csv_file(self, file_path: str) -> pd.DataFrame:
+        """
+        Parse a CSV file into a DataFrame sorted by timestamp.
+        
+        Args:
+            file_path: Path to CSV file
+            
+        Returns:
+            DataFrame with parsed timestamps
+        """
+        # The PyArrow engine tokenizes on multiple threads when it is installed
+        df = pd.read_csv(file_path, engine=_CSV_ENGINE)
+        self.logger.debug(f"Loaded CSV file {file_path} with {len(df)} rows")
+        
+        # Try to convert timestamp column to datetime with specified format
+        try:
+            df[self.timestamp_column] = self._parse_timestamps(df[self.timestamp_column], self.date_format)
+            self.logger.debug(f"Successfully parsed dates with format {self.date_format}")
+        except ValueError:
+            # If that fails, try with a more flexible approach
+            self.logger.warning(f"Failed to parse dates with format {self.date_format}, trying flexible parsing")
+            df[self.timestamp_column] = self._parse_timestamps(df[self.timestamp_column])
+            self.logger.debug(f"Successfully parsed dates with flexible parsing")
+        
+        # Sort by timestamp
+        return df.sort_values(by=self.timestamp_column, ignore_index=True)
+        
+    def _write_cache(self, df: pd.DataFrame, cache_path: str):
+        """
+        Save parsed data to a Feather cache file.
+        
+        Args:
+            df: Parsed DataFrame
+            cache_path: Path of the cache file
+        """
+        try:
+            df.to_feather(cache_path)
+            self.logger.debug(f"Cached parsed data in {cache_path}")
+        except Exception as e:
+            # Caching is best effort, the data has already been loaded
+            self.logger.warning(f"Could not write cache file {cache_path}: {e}")
+            
+    def _store_data(self, symbol: str, df: pd.DataFrame, columns: tuple, timestamps_ns: np.ndarray):
+        """
+        Store loaded data for a symbol.
+        
+        Args:
+            symbol: Symbol the data belongs to
+            df: DataFrame sorted by timestamp
+            columns: Column arrays extracted from the DataFrame
+            timestamps_ns: Sorted int64 nanosecond timestamps
+        """
+        self._data[symbol] = df
+        self._columns[symbol] = columns
+        self._timestamps_ns[symbol] = timestamps_ns
+        self._current_index[symbol] = 0
+        self._symbols = tuple(self._data)
+        
+    def _parse_timestamps(self, column: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+        """
+        Parse a column of timestamp strings, parsing each distinct string only once.
+        
+        Args:
+            column: Column of timestamp strings
+            date_format: Format of the date strings (optional, inferred if not given)
+            
+        Returns:
+            Column of datetimes
+        """
+        unique_values = column.unique()
+        
+        # Caching only pays off when timestamps repeat
+        if len(unique_values) > _TIMESTAMP_CACHE_MAX_UNIQUE_RATIO * len(column):
+            return pd.to_datetime(column, format=date_format)
             
+        parsed = pd.to_datetime(unique_values, format=date_format)
+        return column.map(dict(zip(unique_values, parsed)))
+        
+    def _extract_columns(self, df: pd.DataFrame) -> tuple:
+        """
+        Extract the timestamp and OHLCV columns of a DataFrame as arrays.
+        
+        The OHLCV values are stored row-major, so each bar is one contiguous row.
+        
+        Args:
+            df: DataFrame sorted by timestamp
+            
+        Returns:
+            Tuple of (timestamps, OHLCV) arrays, where OHLCV has one
+            (open, high, low, close, volume) row per timestamp
+        """
+        ohlcv_keys = [self.ohlcv_columns[field] for field in _OHLCV_FIELDS]
+        values = df[ohlcv_keys].to_numpy(dtype=np.float64)
+        ohlcv = np.ascontiguousarray(values, dtype=self.dtype)
+        
+        if self.dtype != np.float64:
+            # Warn if the narrower type loses precision that may matter
+            with np.errstate(divide='ignore', invalid='ignore'):
+                error = np.abs((ohlcv.astype(np.float64) - values) / values)
+            max_error = np.nanmax(np.where(np.isfinite(error), error, 0.0), initial=0.0)
+            if max_error > _DOWNCAST_MAX_RELATIVE_ERROR:
+                self.logger.warning(f"Storing OHLCV values as {self.dtype} loses precision "
+                                    f"(max relative error {max_error:.2e})")
+                
+        return (
+            df[self.timestamp_column].to_numpy(dtype=object),
+            ohlcv
+        )
+        
+    def _index_range(self, symbol: str, start_date: datetime, end_date: datetime) -> tuple:
+        """
+        Find the rows of a symbol whose timestamps fall within a date range.
+        
+        Args:
+            symbol: Symbol to search
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (inclusive)
+            
+        Returns:
+            Tuple of (start, stop) row positions
+        """
+        timestamps_ns = self._timestamps_ns[symbol]
+        lo = np.searchsorted(timestamps_ns, pd.Timestamp(start_date).value, side='left')
+        hi = np.searchsorted(timestamps_ns, pd.Timestamp(end_date).value, side='right')
+        return int(lo), int(hi)
+        
+    def _bar_at(self, symbol: str, idx: int) -> Bar:
+        """
+        Build the Bar at a position in a symbol's data.
+        
+        Args:
+            symbol: Symbol to get data for
+            idx: Row position
+            
+        Returns:
+            Bar object
+        """
+        timestamps, ohlcv = self._columns[symbol]
+        return Bar(timestamps[idx], *ohlcv[idx].tolist())
+        
     def load_directory(self) -> int:
         """
         Load all CSV files in the data directory.
@@ -119,12 +322,17 @@ class CSVDataProvider(DataProvider):
         files = os.listdir(self.data_dir)
         self.logger.debug(f"Found {len(files)} files in directory: {files}")
         
-        for filename in files:
-            if filename.endswith('.csv'):
-                file_path = os.path.join(self.data_dir, filename)
-                symbol = os.path.splitext(filename)[0]
-                self.logger.debug(f"Attempting to load {file_path} for symbol {symbol}")
-                if self.load_csv_file(file_path, symbol):
+        csv_files = [filename for filename in files if filename.endswith('.csv')]
+        file_paths = [os.path.join(self.data_dir, filename) for filename in csv_files]
+        symbols = [os.path.splitext(filename)[0] for filename in csv_files]
+        
+        # Files are independent, so read them in parallel and store them in listing order
+        max_workers = min(32, (os.cpu_count() or 1) * 4, max(len(file_paths), 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._read_csv_file, file_paths, symbols)
+            for symbol, loaded in zip(symbols, results):
+                if loaded is not None:
+                    self._store_data(symbol, *loaded)
                     count += 1
                     
         self.logger.info(f"Loaded {count} CSV files from {self.data_dir}")
@@ -147,39 +355,57 @@ class CSVDataProvider(DataProvider):
         """Replay historical data at the specified speed."""
         self.logger.debug(f"Starting data replay with {len(self._data)} symbols")
         
+        # Bars overwritten in place on every time step when bar reuse is enabled
+        scratch_bars = None
+        scratch_data = {}
+        if self.reuse_bars:
+            scratch_bars = {symbol: Bar(None, 0.0, 0.0, 0.0, 0.0, 0.0) for symbol in self._columns}
+            
+        # Schedule updates against a monotonic clock so sleep overshoot does not accumulate
+        next_time = time.monotonic()
+        
         while self._running:
             # Get current data for all symbols
-            data = {}
-            for symbol, df in self._data.items():
-                idx = self._current_index[symbol]
-                if idx < len(df):
-                    row = df.iloc[idx]
-                    bar = Bar(
-                        timestamp=row[self.timestamp_column],
-                        open=row[self.ohlcv_columns['open']],
-                        high=row[self.ohlcv_columns['high']],
-                        low=row[self.ohlcv_columns['low']],
-                        close=row[self.ohlcv_columns['close']],
-                        volume=row[self.ohlcv_columns['volume']]
-                    )
-                    data[symbol] = bar
-                    self._current_index[symbol] += 1
+            if scratch_bars is None:
+                data = {}
+                for symbol, (timestamps, ohlcv) in self._columns.items():
+                    idx = self._current_index[symbol]
+                    if idx < len(timestamps):
+                        if self.use_views:
+                            data[symbol] = BarView(timestamps, ohlcv, idx)
+                        else:
+                            data[symbol] = self._bar_at(symbol, idx)
+                        self._current_index[symbol] += 1
+            else:
+                data = scratch_data
+                data.clear()
+                for symbol, (timestamps, ohlcv) in self._columns.items():
+                    idx = self._current_index[symbol]
+                    if idx < len(timestamps):
+                        bar = scratch_bars[symbol]
+                        bar.timestamp = timestamps[idx]
+                        bar.open, bar.high, bar.low, bar.close, bar.volume = ohlcv[idx].tolist()
+                        data[symbol] = bar
+                        self._current_index[symbol] += 1
                     
             # Notify subscribers if we have data
             if data:
-                self.logger.debug(f"Notifying subscribers with data for {len(data)} symbols")
+                self.logger.debug("Notifying subscribers with data for %d symbols", len(data))
                 self.notify_subscribers(data)
             else:
                 self.logger.debug("No data to send to subscribers")
                 
             # Check if we've reached the end of all data
-            if all(self._current_index[symbol] >= len(df) for symbol, df in self._data.items()):
+            if all(self._current_index[symbol] >= len(columns[0]) for symbol, columns in self._columns.items()):
                 self.logger.info("Reached end of all data")
                 self._running = False
                 break
                 
             # Sleep until next update
-            time.sleep(self._replay_interval)
+            next_time += self._replay_interval
+            delay = next_time - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
             
     def start(self):
         """Start the data provider."""
@@ -190,6 +416,7 @@ class CSVDataProvider(DataProvider):
             raise ValueError("No data loaded")
             
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._replay_data)
         self._thread.daemon = True
         self._thread.start()
@@ -199,12 +426,45 @@ class CSVDataProvider(DataProvider):
     def stop(self):
         """Stop the data provider."""
         self._running = False
+        self._stop_event.set()
         if self._thread is not None:
             self._thread.join(timeout=5.0)
             self._thread = None
             
         self.logger.info("CSV data provider stopped")
         
+    def is_running(self) -> bool:
+        """
+        Check whether the data provider is currently replaying data.
+        
+        Returns:
+            True if running, False otherwise
+        """
+        return self._running
+        
+    def running_thread(self) -> Optional[threading.Thread]:
+        """
+        Get the replay thread.
+        
+        Returns:
+            Thread object if started, None otherwise
+        """
+        return self._thread
+        
+    def reset_indices(self):
+        """Rewind all symbols to the start of their data."""
+        for symbol in self._current_index:
+            self._current_index[symbol] = 0
+            
+    def snapshot_data_stats(self) -> Dict[str, int]:
+        """
+        Get the number of data points loaded for each symbol.
+        
+        Returns:
+            Dictionary mapping symbol to number of data points
+        """
+        return {symbol: len(df) for symbol, df in self._data.items()}
+        
     def reset(self):
         """Reset the data provider state."""
         self.logger.debug("Resetting CSV data provider")
@@ -214,8 +474,7 @@ class CSVDataProvider(DataProvider):
             self.stop()
             
         # Reset indices
-        for symbol in self._current_index:
-            self._current_index[symbol] = 0
+        self.reset_indices()
             
         self.logger.debug("CSV data provider reset complete")
         
@@ -231,19 +490,10 @@ class CSVDataProvider(DataProvider):
         """
         result = {}
         for symbol in symbols:
-            if symbol in self._data:
+            if symbol in self._columns:
                 idx = self._current_index[symbol]
                 if idx > 0:  # We have some data
-                    row = self._data[symbol].iloc[idx - 1]
-                    bar = Bar(
-                        timestamp=row[self.timestamp_column],
-                        open=row[self.ohlcv_columns['open']],
-                        high=row[self.ohlcv_columns['high']],
-                        low=row[self.ohlcv_columns['low']],
-                        close=row[self.ohlcv_columns['close']],
-                        volume=row[self.ohlcv_columns['volume']]
-                    )
-                    result[symbol] = bar
+                    result[symbol] = self._bar_at(symbol, idx - 1)
                     
         return result
         
@@ -268,25 +518,54 @@ class CSVDataProvider(DataProvider):
         if end_date is None:
             end_date = datetime.now()
             
-        # Filter data by date range
-        df = self._data[symbol]
-        mask = (df[self.timestamp_column] >= start_date) & (df[self.timestamp_column] <= end_date)
-        filtered_df = df[mask]
+        # Locate the date range in the sorted timestamps
+        lo, hi = self._index_range(symbol, start_date, end_date)
         
         # Convert to Bar objects
-        bars = []
-        for _, row in filtered_df.iterrows():
-            bar = Bar(
-                timestamp=row[self.timestamp_column],
-                open=row[self.ohlcv_columns['open']],
-                high=row[self.ohlcv_columns['high']],
-                low=row[self.ohlcv_columns['low']],
-                close=row[self.ohlcv_columns['close']],
-                volume=row[self.ohlcv_columns['volume']]
-            )
-            bars.append(bar)
-            
-        return bars
+        timestamps, ohlcv = self._columns[symbol]
+        return [
+            Bar(timestamp, *row)
+            for timestamp, row in zip(timestamps[lo:hi], ohlcv[lo:hi].tolist())
+        ]
+        
+    def get_historical_arrays(self, symbol: str, start_date: datetime,
+                              end_date: Optional[datetime] = None,
+                              out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get historical market data for a symbol as NumPy arrays.
+        
+        Args:
+            symbol: Symbol to get data for
+            start_date: Start date for historical data
+            end_date: End date for historical data (defaults to current time)
+            out: Arrays to write the data into, keyed like the result (optional).
+                Each array must be at least as long as the data.
+            
+        Returns:
+            Dictionary mapping 'timestamp', 'open', 'high', 'low', 'close' and
+            'volume' to arrays; views into out if it was given
+        """
+        if symbol not in self._data:
+            lo = hi = 0
+        else:
+            if end_date is None:
+                end_date = datetime.now()
+                
+            # Locate the date range in the sorted timestamps
+            lo, hi = self._index_range(symbol, start_date, end_date)
+            
+        timestamps_ns = self._timestamps_ns.get(symbol, np.empty(0, dtype=np.int64))
+        ohlcv = self._columns[symbol][1] if symbol in self._columns else np.empty((0, len(_OHLCV_FIELDS)))
+        
+        # Views into the cached arrays, copied below so callers cannot modify the cache
+        arrays = {'timestamp': timestamps_ns[lo:hi].view('datetime64[ns]')}
+        for i, field in enumerate(_OHLCV_FIELDS):
+            arrays[field] = ohlcv[lo:hi, i]
+            
+        if out is not None:
+            return _copy_to_out(arrays, out)
+            
+        return {field: values.copy() for field, values in arrays.items()}
         
     def get_latest_bar(self, symbol: str) -> Optional[Bar]:
         """
@@ -303,24 +582,31 @@ class CSVDataProvider(DataProvider):
             
         idx = self._current_index[symbol]
         if idx > 0:  # We have some data
-            row = self._data[symbol].iloc[idx - 1]
-            bar = Bar(
-                timestamp=row[self.timestamp_column],
-                open=row[self.ohlcv_columns['open']],
-                high=row[self.ohlcv_columns['high']],
-                low=row[self.ohlcv_columns['low']],
-                close=row[self.ohlcv_columns['close']],
-                volume=row[self.ohlcv_columns['volume']]
-            )
-            return bar
+            return self._bar_at(symbol, idx - 1)
             
         return None
         
-    def get_symbols(self) -> List[str]:
+    def get_last_bar(self, symbol: str) -> Optional[Bar]:
+        """
+        Get the last bar loaded for a symbol, regardless of replay position.
+        
+        Args:
+            symbol: Symbol to get data for
+            
+        Returns:
+            Bar object if available, None otherwise
+        """
+        columns = self._columns.get(symbol)
+        if columns is None or len(columns[0]) == 0:
+            return None
+            
+        return self._bar_at(symbol, -1)
+        
+    def get_symbols(self) -> Sequence[str]:
         """
         Get all available symbols.
         
         Returns:
-            List of available symbols
+            Tuple of available symbols, shared between calls
         """
-        return list(self._data.keys()) 
\ No newline at end of file
+        return self._symbols 
\ No newline at end of file
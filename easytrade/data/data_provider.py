@@ -1,11 +1,40 @@
 """
 Abstract base class for data providers.
 """
+import threading
+import numpy as np
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime, timedelta
 
-from easytrade.core.types import Bar
+from easytrade.core.types import Bar, BarBatch
+
+
+# Keys of the arrays returned by get_historical_arrays
+HISTORICAL_ARRAY_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def _copy_to_out(arrays: Dict[str, np.ndarray],
+                 out: Optional[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Copy historical arrays into caller-provided buffers.
+    
+    Args:
+        arrays: Arrays to copy
+        out: Buffers to copy into, or None to return the arrays as is
+        
+    Returns:
+        Views of the filled part of each buffer, or arrays if out is None
+    """
+    if out is None:
+        return arrays
+        
+    result = {}
+    for field, values in arrays.items():
+        buffer = out[field][:len(values)]
+        buffer[...] = values
+        result[field] = buffer
+    return result
 
 
 class DataProvider(ABC):
@@ -19,6 +48,8 @@ class DataProvider(ABC):
     def __init__(self):
         """Initialize the data provider."""
         self._subscribers = []
+        self._data_handlers = ()  # Bound on_data handlers, in subscription order
+        self._batch_handlers = ()  # (on_data_batch, on_data) handler pairs, in subscription order
         
     def add_subscriber(self, subscriber):
         """
@@ -29,6 +60,7 @@ class DataProvider(ABC):
         """
         if subscriber not in self._subscribers:
             self._subscribers.append(subscriber)
+            self._build_handlers()
             
     def remove_subscriber(self, subscriber):
         """
@@ -39,7 +71,32 @@ class DataProvider(ABC):
         """
         if subscriber in self._subscribers:
             self._subscribers.remove(subscriber)
+            self._build_handlers()
             
+    def _build_handlers(self):
+        """Resolve the handler of each subscriber once, so notifications need no type checks."""
+        data_handlers = []
+        batch_handlers = []
+        for subscriber in self._subscribers:
+            if callable(subscriber):
+                # If subscriber is a callable (function), call it directly
+                data_handler = subscriber
+            elif hasattr(subscriber, 'on_data'):
+                # If subscriber has an on_data method, call that
+                data_handler = subscriber.on_data
+            else:
+                data_handler = None
+                
+            if data_handler is not None:
+                data_handlers.append(data_handler)
+                
+            batch_handler = getattr(subscriber, 'on_data_batch', None)
+            if batch_handler is not None or data_handler is not None:
+                batch_handlers.append((batch_handler, data_handler))
+                
+        self._data_handlers = tuple(data_handlers)
+        self._batch_handlers = tuple(batch_handlers)
+        
     def notify_subscribers(self, data: Dict[str, Bar]):
         """
         Notify all subscribers with new data.
@@ -47,14 +104,72 @@ class DataProvider(ABC):
         Args:
             data: Dictionary mapping symbol to Bar object
         """
-        for subscriber in self._subscribers:
-            if callable(subscriber):
-                # If subscriber is a callable (function), call it directly
-                subscriber(data)
-            elif hasattr(subscriber, 'on_data'):
-                # If subscriber has an on_data method, call that
-                subscriber.on_data(data)
+        for handler in self._data_handlers:
+            handler(data)
             
+    def notify_subscribers_batch(self, batch: BarBatch):
+        """
+        Notify all subscribers with new data in array form.
+        
+        Subscribers with an on_data_batch method receive the batch as is;
+        all others receive it converted to a dictionary of Bar objects.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        data = None
+        for batch_handler, data_handler in self._batch_handlers:
+            if batch_handler is not None:
+                batch_handler(batch)
+                continue
+                
+            if data is None:
+                data = batch.to_bars()
+            data_handler(data)
+                
+    def is_running(self) -> bool:
+        """
+        Check whether the data provider is currently producing data.
+        
+        Returns:
+            True if running, False otherwise
+        """
+        return False
+    
+    def running_thread(self) -> Optional[threading.Thread]:
+        """
+        Get the thread that produces data, if the provider uses one.
+        
+        Returns:
+            Thread object if available, None otherwise
+        """
+        return None
+    
+    def reset_indices(self):
+        """Rewind replay positions to the start of the data, if supported."""
+        pass
+    
+    def snapshot_data_stats(self) -> Dict[str, int]:
+        """
+        Get the number of data points loaded for each symbol.
+        
+        Returns:
+            Dictionary mapping symbol to number of data points
+        """
+        return {}
+    
+    def get_last_bar(self, symbol: str) -> Optional[Bar]:
+        """
+        Get the last bar available for a symbol, regardless of replay position.
+        
+        Args:
+            symbol: Symbol to get data for
+            
+        Returns:
+            Bar object if available, None otherwise
+        """
+        return None
+    
     @abstractmethod
     def start(self):
         """Start the data provider."""
@@ -96,6 +211,33 @@ class DataProvider(ABC):
         """
         pass
     
+    def get_historical_arrays(self, symbol: str, start_date: datetime,
+                              end_date: Optional[datetime] = None,
+                              out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get historical market data for a symbol as NumPy arrays.
+        
+        The default implementation converts the result of get_historical_data;
+        providers that keep their data in arrays should override it.
+        
+        Args:
+            symbol: Symbol to get data for
+            start_date: Start date for historical data
+            end_date: End date for historical data (defaults to current time)
+            out: Arrays to write the data into, keyed like the result (optional).
+                Each array must be at least as long as the data.
+            
+        Returns:
+            Dictionary mapping 'timestamp', 'open', 'high', 'low', 'close' and
+            'volume' to arrays; views into out if it was given
+        """
+        bars = self.get_historical_data(symbol, start_date, end_date)
+        arrays = {'timestamp': np.array([bar.timestamp for bar in bars], dtype='datetime64[ns]')}
+        for field in HISTORICAL_ARRAY_FIELDS[1:]:
+            arrays[field] = np.array([getattr(bar, field) for bar in bars], dtype=np.float64)
+            
+        return _copy_to_out(arrays, out)
+    
     @abstractmethod
     def get_latest_bar(self, symbol: str) -> Optional[Bar]:
         """
@@ -0,0 +1,184 @@
+"""
+Shared-memory hand-off of market data to subscribers in other processes.
+"""
+import time
+import logging
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from easytrade.core.types import Bar, BarBatch
+
+
+# Layout of one symbol slot in the shared buffer
+BAR_DTYPE = np.dtype([
+    ('timestamp', 'i8'),  # Nanoseconds since the epoch
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+# The buffer starts with a sequence counter, followed by one slot per symbol
+_HEADER_DTYPE = np.dtype('u8')
+_HEADER_SIZE = BAR_DTYPE.alignment * ((_HEADER_DTYPE.itemsize + BAR_DTYPE.alignment - 1) // BAR_DTYPE.alignment)
+
+
+def _views(buffer, num_symbols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Create the sequence counter and bar array views over a shared buffer.
+    
+    Args:
+        buffer: Shared memory buffer
+        num_symbols: Number of symbol slots
+    
+    Returns:
+        Tuple of (sequence counter, bar array)
+    """
+    sequence = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=buffer)
+    bars = np.ndarray((num_symbols,), dtype=BAR_DTYPE, buffer=buffer, offset=_HEADER_SIZE)
+    return sequence, bars
+
+
+class SharedMemoryPublisher:
+    """
+    Data subscriber that writes every update into a shared-memory buffer.
+    
+    Each symbol has a fixed slot in a structured array, so processes that
+    attach with SharedMemoryReader read the latest bars without any pickling.
+    A sequence counter in the buffer is odd while an update is being written
+    and even otherwise; readers use it to detect new data and torn reads.
+    """
+    
+    def __init__(self, symbols: List[str], name: Optional[str] = None):
+        """
+        Initialize the publisher and allocate the shared buffer.
+        
+        Args:
+            symbols: Symbols to publish, in slot order
+            name: Name of the shared memory block (optional, generated if not given)
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.symbols = list(symbols)
+        self._slots = {symbol: i for i, symbol in enumerate(self.symbols)}
+        
+        size = _HEADER_SIZE + BAR_DTYPE.itemsize * max(len(self.symbols), 1)
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._sequence, self._bars = _views(self._shm.buf, len(self.symbols))
+        self._sequence[0] = 0
+        self._bars[:] = np.zeros(len(self.symbols), dtype=BAR_DTYPE)
+        
+        self.logger.info(f"Publishing {len(self.symbols)} symbols to shared memory {self._shm.name}")
+    
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block, used by readers to attach."""
+        return self._shm.name
+    
+    @property
+    def sequence(self) -> int:
+        """Number of updates published so far."""
+        return int(self._sequence[0]) // 2
+    
+    def on_data(self, data: Dict[str, Bar]):
+        """
+        Write new market data into the shared buffer.
+        
+        Args:
+            data: Dictionary mapping symbol to Bar object
+        """
+        bars = self._bars
+        self._sequence[0] += 1
+        try:
+            for symbol, bar in data.items():
+                slot = self._slots.get(symbol)
+                if slot is not None:
+                    bars[slot] = (pd.Timestamp(bar.timestamp).value, bar.open, bar.high,
+                                  bar.low, bar.close, bar.volume)
+        finally:
+            # Always end the update, so a failed write cannot block the readers
+            self._sequence[0] += 1
+    
+    def on_data_batch(self, batch: BarBatch):
+        """
+        Write new market data in array form into the shared buffer.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        bars = self._bars
+        self._sequence[0] += 1
+        try:
+            for i, symbol in enumerate(batch.symbols.tolist()):
+                slot = self._slots.get(symbol)
+                if slot is not None:
+                    bars[slot] = (pd.Timestamp(batch.timestamps[i]).value, batch.opens[i], batch.highs[i],
+                                  batch.lows[i], batch.closes[i], batch.volumes[i])
+        finally:
+            self._sequence[0] += 1
+    
+    def close(self):
+        """Release the shared buffer."""
+        self._sequence = self._bars = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class SharedMemoryReader:
+    """
+    Reads market data published by a SharedMemoryPublisher in another process.
+    """
+    
+    def __init__(self, name: str, symbols: List[str]):
+        """
+        Attach to a shared buffer.
+        
+        Args:
+            name: Name of the shared memory block
+            symbols: Symbols published, in the same slot order as the publisher
+        """
+        self.symbols = list(symbols)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._sequence, self._bars = _views(self._shm.buf, len(self.symbols))
+    
+    @property
+    def sequence(self) -> int:
+        """Number of updates published so far."""
+        return int(self._sequence[0]) // 2
+    
+    def read(self, timeout: float = 1.0) -> Tuple[int, np.ndarray]:
+        """
+        Copy the latest bars out of the shared buffer.
+        
+        The copy is retried if the publisher wrote an update while it was taken.
+        
+        Args:
+            timeout: Seconds to keep retrying before giving up
+            
+        Returns:
+            Tuple of (sequence, bars), where sequence is the number of updates
+            included and bars is a structured array with one BAR_DTYPE row per symbol
+            
+        Raises:
+            TimeoutError: If no consistent copy could be taken within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = int(self._sequence[0])
+            if not sequence % 2:
+                bars = self._bars.copy()
+                if int(self._sequence[0]) == sequence:
+                    return sequence // 2, bars
+                    
+            # Update in progress, let the publisher finish it
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No consistent read of shared memory {self._shm.name} within {timeout} seconds")
+            time.sleep(0)
+    
+    def close(self):
+        """Detach from the shared buffer."""
+        self._sequence = self._bars = None
+        self._shm.close()
@@ -0,0 +1,87 @@
+"""
+Order matching kernel used by the vectorized backtest.
+
+match_orders walks each order forward through the bars of its symbol until
+the order's fill rule is met. Order types and sides are passed as integer
+codes, so the whole order table is handled in one compiled call.
+"""
+from typing import Tuple
+
+import numpy as np
+
+from easytrade._numba import NUMBA_AVAILABLE, njit
+from easytrade.core.types import OrderType, OrderSide
+
+
+# Integer codes of the enums, as plain ints for the compiled code
+_MARKET = int(OrderType.MARKET)
+_STOP = int(OrderType.STOP)
+_STOP_LIMIT = int(OrderType.STOP_LIMIT)
+_BUY = int(OrderSide.BUY)
+
+
+@njit(cache=True)
+def match_orders(ohlc: np.ndarray, bars: np.ndarray, symbols: np.ndarray, sides: np.ndarray,
+                 order_types: np.ndarray, prices: np.ndarray,
+                 stop_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the fill bar and execution price of each order.
+    
+    Uses the same rules as BacktestExecutionProvider: an order can fill from
+    the bar after the one it was placed on; market orders fill at the open,
+    limit and stop-limit orders at the limit price, and stop orders at the
+    stop price.
+    
+    Args:
+        ohlc: Open, high, low and close prices, shape (bars, symbols, 4)
+        bars: Bar at which each order was placed
+        symbols: Symbol column of each order
+        sides: OrderSide value of each order
+        order_types: OrderType value of each order
+        prices: Limit price of each order
+        stop_prices: Stop price of each order
+    
+    Returns:
+        Tuple of (fill bar or -1, execution price or NaN) arrays
+    """
+    num_bars = ohlc.shape[0]
+    num_orders = bars.shape[0]
+    fill_bars = np.full(num_orders, -1, dtype=np.int64)
+    fill_prices = np.full(num_orders, np.nan)
+    
+    for i in range(num_orders):
+        symbol = symbols[i]
+        is_buy = sides[i] == _BUY
+        order_type = order_types[i]
+        price = prices[i]
+        stop_price = stop_prices[i]
+        triggered = order_type != _STOP_LIMIT
+        
+        for t in range(bars[i] + 1, num_bars):
+            high = ohlc[t, symbol, 1]
+            low = ohlc[t, symbol, 2]
+            
+            if order_type == _MARKET:
+                fill_bars[i] = t
+                fill_prices[i] = ohlc[t, symbol, 0]
+                break
+            
+            if order_type == _STOP:
+                if (is_buy and high >= stop_price) or (not is_buy and low <= stop_price):
+                    fill_bars[i] = t
+                    fill_prices[i] = stop_price
+                    break
+                continue
+            
+            # Stop-limit orders become limit orders once the stop price is reached
+            if not triggered:
+                triggered = (is_buy and high >= stop_price) or (not is_buy and low <= stop_price)
+                if not triggered:
+                    continue
+            
+            if (is_buy and low <= price) or (not is_buy and high >= price):
+                fill_bars[i] = t
+                fill_prices[i] = price
+                break
+    
+    return fill_bars, fill_prices
@@ -1,19 +1,66 @@
 """
 Backtest execution provider for simulating order execution.
 """
-import uuid
+import heapq
 import logging
-from typing import Dict, List, Optional, Union, Any
+from operator import itemgetter
+import numpy as np
+from typing import Callable, Dict, List, Optional, Union, Any
 from datetime import datetime
-import copy
 
 from easytrade.execution.execution_provider import ExecutionProvider
+from easytrade.execution.vectorized_backtest import VectorizedBacktestResult, run_vectorized_backtest
 from easytrade.core.types import (
     Order, OrderType, OrderSide, OrderStatus, TimeInForce,
-    Position, Portfolio, Trade, Bar
+    Position, Portfolio, Trade, Bar, BarBatch
 )
 
 
+def _stop_limit_buy_check(order: Order, bar: Bar) -> bool:
+    """Convert a buy stop-limit order to a limit order once its stop price is reached."""
+    if bar.high >= order.stop_price:
+        order.order_type = OrderType.LIMIT
+        return bar.low <= order.price
+    return False
+
+
+def _stop_limit_sell_check(order: Order, bar: Bar) -> bool:
+    """Convert a sell stop-limit order to a limit order once its stop price is reached."""
+    if bar.low <= order.stop_price:
+        order.order_type = OrderType.LIMIT
+        return bar.high >= order.price
+    return False
+
+
+def _close_price(order: Order, bar: Bar) -> float:
+    """Fallback execution price: the close of the bar."""
+    return bar.close
+
+
+# (order type, side) -> function telling whether the order executes on a bar
+_EXECUTION_CHECKS = {
+    # Market orders always execute
+    (OrderType.MARKET, OrderSide.BUY): lambda order, bar: True,
+    (OrderType.MARKET, OrderSide.SELL): lambda order, bar: True,
+    # Limit orders execute when the bar reaches the limit price
+    (OrderType.LIMIT, OrderSide.BUY): lambda order, bar: bar.low <= order.price,
+    (OrderType.LIMIT, OrderSide.SELL): lambda order, bar: bar.high >= order.price,
+    # Stop orders execute when the bar reaches the stop price
+    (OrderType.STOP, OrderSide.BUY): lambda order, bar: bar.high >= order.stop_price,
+    (OrderType.STOP, OrderSide.SELL): lambda order, bar: bar.low <= order.stop_price,
+    # Stop-limit orders become limit orders when the bar reaches the stop price
+    (OrderType.STOP_LIMIT, OrderSide.BUY): _stop_limit_buy_check,
+    (OrderType.STOP_LIMIT, OrderSide.SELL): _stop_limit_sell_check,
+}
+
+# Order type -> function giving the execution price of a filled order
+_EXECUTION_PRICES = {
+    OrderType.MARKET: lambda order, bar: bar.open,  # Open price for market orders
+    OrderType.LIMIT: lambda order, bar: order.price,  # Limit price for limit orders
+    OrderType.STOP: lambda order, bar: order.stop_price,  # Stop price for stop orders
+}
+
+
 class BacktestExecutionProvider(ExecutionProvider):
     """
     Backtest execution provider for simulating order execution.
@@ -40,6 +87,15 @@ class BacktestExecutionProvider(ExecutionProvider):
         self.positions = {}  # symbol -> Position
         self.orders = {}  # order_id -> Order
         self.trades = []  # List of Trade objects
+        self._scan_orders = {}  # order_id -> (sequence, Order), open orders checked on every bar
+        self._limit_books = {}  # symbol -> (buy heap, sell heap) of resting limit orders
+        self._next_sequence = 0  # Placement sequence number of the next order
+        self._market_value = 0.0  # Running total market value of all positions
+        self._sim_time = None  # Timestamp of the latest bar, used as the current time
+        
+        # Order updates and trades from fills, sent out together after each bar
+        self._pending_order_updates = []
+        self._pending_trades = []
         
         self._running = False
         
@@ -59,6 +115,13 @@ class BacktestExecutionProvider(ExecutionProvider):
         self.positions = {}
         self.orders = {}
         self.trades = []
+        self._scan_orders = {}
+        self._limit_books = {}
+        self._next_sequence = 0
+        self._market_value = 0.0
+        self._sim_time = None
+        self._pending_order_updates = []
+        self._pending_trades = []
         self._running = False
         self.logger.info("Backtest execution provider reset")
         
@@ -89,8 +152,11 @@ class BacktestExecutionProvider(ExecutionProvider):
         if order_type in [OrderType.STOP, OrderType.STOP_LIMIT] and stop_price is None:
             raise ValueError(f"Stop price is required for {order_type.name} orders")
             
-        # Create order
-        order_id = str(uuid.uuid4())
+        # Create order, numbered in placement order so ids are reproducible
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        order_id = str(sequence)
+        now = self._now()
         order = Order(
             id=order_id,
             symbol=symbol,
@@ -101,14 +167,18 @@ class BacktestExecutionProvider(ExecutionProvider):
             stop_price=stop_price,
             time_in_force=time_in_force,
             status=OrderStatus.ACCEPTED,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+            created_at=now,
+            updated_at=now
         )
         
         self.orders[order_id] = order
+        if order_type == OrderType.LIMIT:
+            self._add_limit_order(sequence, order)
+        else:
+            self._scan_orders[order_id] = (sequence, order)
         self.notify_order_update(order)
         
-        self.logger.info(f"Order placed: {order.id} {order.side.name} {order.quantity} {order.symbol}")
+        self.logger.info("Order placed: %s %s %s %s", order.id, order.side.name, order.quantity, order.symbol)
         return order
         
     def cancel_order(self, order_id: str) -> bool:
@@ -131,10 +201,12 @@ class BacktestExecutionProvider(ExecutionProvider):
             return False
             
         order.status = OrderStatus.CANCELED
-        order.updated_at = datetime.now()
+        order.updated_at = self._now()
+        if self._scan_orders.pop(order_id, None) is None and order.order_type == OrderType.LIMIT:
+            self._remove_limit_order(order)
         self.notify_order_update(order)
         
-        self.logger.info(f"Order canceled: {order_id}")
+        self.logger.info("Order canceled: %s", order_id)
         return True
         
     def get_order(self, order_id: str) -> Optional[Order]:
@@ -192,9 +264,15 @@ class BacktestExecutionProvider(ExecutionProvider):
         Returns:
             Portfolio object
         """
+        # Positions only hold scalars, so a flat copy of each is enough
+        positions = {
+            symbol: Position(pos.symbol, pos.quantity, pos.average_entry_price, pos.current_price)
+            for symbol, pos in self.positions.items()
+        }
         return Portfolio(
             cash=self.cash,
-            positions=copy.deepcopy(self.positions)
+            positions=positions,
+            position_value=self._market_value
         )
         
     def process_market_data(self, data: Dict[str, Bar]):
@@ -207,25 +285,211 @@ class BacktestExecutionProvider(ExecutionProvider):
         if not self._running:
             return
             
+        # Simulated time advances with the data
+        if data:
+            self._sim_time = next(iter(data.values())).timestamp
+            
+        # Update positions with current prices; there are usually fewer positions than symbols
+        for symbol, position in self.positions.items():
+            bar = data.get(symbol)
+            if bar is not None:
+                self._reprice(position, bar.close)
+                
+        # Process open orders
+        self._process_orders(data.get)
+        
+        self._flush_notifications()
+                
+    def process_market_data_batch(self, batch: BarBatch):
+        """
+        Process market data in array form and update orders and positions.
+        
+        Only positions and open orders read from the batch, so Bar objects are
+        built just for symbols that have an open order.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        if not self._running:
+            return
+            
+        index = {symbol: i for i, symbol in enumerate(batch.symbols.tolist())}
+        
+        # Simulated time advances with the data
+        if len(batch):
+            self._sim_time = batch.timestamps[0]
+        
         # Update positions with current prices
-        for symbol, bar in data.items():
-            if symbol in self.positions:
-                self.positions[symbol].current_price = bar.close
+        closes = batch.closes
+        for symbol, position in self.positions.items():
+            i = index.get(symbol)
+            if i is not None:
+                self._reprice(position, float(closes[i]))
                 
-        # Process orders
-        for order_id, order in list(self.orders.items()):
-            if order.status not in [OrderStatus.ACCEPTED, OrderStatus.PARTIALLY_FILLED]:
+        # Process orders, building Bars only for symbols that have candidate orders
+        bars = {}
+        
+        def bar_for(symbol: str) -> Optional[Bar]:
+            bar = bars.get(symbol)
+            if bar is None:
+                i = index.get(symbol)
+                if i is None:
+                    return None
+                bar = Bar(
+                    timestamp=batch.timestamps[i],
+                    open=float(batch.opens[i]),
+                    high=float(batch.highs[i]),
+                    low=float(batch.lows[i]),
+                    close=float(closes[i]),
+                    volume=float(batch.volumes[i])
+                )
+                bars[symbol] = bar
+            return bar
+            
+        self._process_orders(bar_for)
+        
+        self._flush_notifications()
+                
+    def _add_limit_order(self, sequence: int, order: Order):
+        """
+        Add a limit order to its symbol's order book.
+        
+        Buy orders are keyed by negated price so the highest bid is on top of its heap.
+        
+        Args:
+            sequence: Placement sequence number of the order
+            order: Limit order
+        """
+        book = self._limit_books.get(order.symbol)
+        if book is None:
+            book = self._limit_books[order.symbol] = ([], [])
+            
+        if order.side == OrderSide.BUY:
+            heapq.heappush(book[0], (-order.price, sequence, order))
+        else:
+            heapq.heappush(book[1], (order.price, sequence, order))
+            
+    def _remove_limit_order(self, order: Order):
+        """
+        Remove a resting limit order from its symbol's order book.
+        
+        The symbol's book is dropped once it holds no orders.
+        
+        Args:
+            order: Limit order
+        """
+        book = self._limit_books.get(order.symbol)
+        if book is None:
+            return
+            
+        heap = book[0] if order.side == OrderSide.BUY else book[1]
+        for i, entry in enumerate(heap):
+            if entry[2] is order:
+                heap[i] = heap[-1]
+                heap.pop()
+                heapq.heapify(heap)
+                break
+                
+        if not book[0] and not book[1]:
+            del self._limit_books[order.symbol]
+            
+    def _process_orders(self, bar_for: Callable[[str], Optional[Bar]]):
+        """
+        Execute the open orders that the current bars fill.
+        
+        Resting limit orders are matched against the bar range through their
+        order books, so only the limit orders that fill are touched. All other
+        open orders are checked one by one. Orders that fill are executed in
+        the order they were placed.
+        
+        Args:
+            bar_for: Function returning the current bar of a symbol, or None if
+                there is no data for it
+        """
+        if not self._scan_orders and not self._limit_books:
+            # No open orders, which is the case on most bars of a typical backtest
+            return
+            
+        candidates = []
+        
+        for sequence, order in self._scan_orders.values():
+            bar = bar_for(order.symbol)
+            if bar is not None:
+                candidates.append((sequence, order, bar))
+                
+        empty_books = []
+        for symbol, (buys, sells) in self._limit_books.items():
+            if not buys and not sells:
+                empty_books.append(symbol)
                 continue
                 
-            if order.symbol not in data:
+            bar = bar_for(symbol)
+            if bar is None:
                 continue
                 
-            bar = data[order.symbol]
+            # Buy limits fill when the low reaches them, sell limits when the high does
+            while buys and -buys[0][0] >= bar.low:
+                _, sequence, order = heapq.heappop(buys)
+                candidates.append((sequence, order, bar))
+            while sells and sells[0][0] <= bar.high:
+                _, sequence, order = heapq.heappop(sells)
+                candidates.append((sequence, order, bar))
+                
+        # Drop books emptied on earlier bars so the check above can skip idle bars
+        for symbol in empty_books:
+            del self._limit_books[symbol]
             
-            # Check if order should be executed
+        candidates.sort(key=itemgetter(0))
+        
+        for sequence, order, bar in candidates:
+            # Skip orders that are no longer open
+            if order.status not in [OrderStatus.ACCEPTED, OrderStatus.PARTIALLY_FILLED]:
+                continue
+                
             if self._should_execute_order(order, bar):
                 self._execute_order(order, bar)
+            elif order.order_type == OrderType.LIMIT and order.id in self._scan_orders:
+                # A stop-limit order was triggered and now rests as a limit order
+                del self._scan_orders[order.id]
+                self._add_limit_order(sequence, order)
                 
+    def _flush_notifications(self):
+        """Send the order updates and trades collected while processing a bar."""
+        if self._pending_order_updates:
+            orders = self._pending_order_updates
+            self._pending_order_updates = []
+            self.notify_order_updates(orders)
+            
+        if self._pending_trades:
+            trades = self._pending_trades
+            self._pending_trades = []
+            self.notify_trades(trades)
+            
+    def _now(self) -> datetime:
+        """
+        Get the current simulated time.
+        
+        Returns:
+            Timestamp of the latest bar processed, or the wall-clock time before any data
+        """
+        sim_time = self._sim_time
+        return sim_time if sim_time is not None else datetime.now()
+        
+    def _reprice(self, position: Position, price: float):
+        """
+        Set the current price of a position and update the running market value.
+        
+        Args:
+            position: Position to update
+            price: New current price
+        """
+        old_price = position.current_price
+        if old_price is None:
+            self._market_value += position.quantity * price
+        else:
+            self._market_value += position.quantity * (price - old_price)
+        position.current_price = price
+        
     def _should_execute_order(self, order: Order, bar: Bar) -> bool:
         """
         Check if an order should be executed based on market data.
@@ -237,36 +501,7 @@ class BacktestExecutionProvider(ExecutionProvider):
         Returns:
             True if order should be executed, False otherwise
         """
-        # For market orders, always execute
-        if order.order_type == OrderType.MARKET:
-            return True
-            
-        # For limit orders, check price
-        if order.order_type == OrderType.LIMIT:
-            if order.side == OrderSide.BUY and bar.low <= order.price:
-                return True
-            elif order.side == OrderSide.SELL and bar.high >= order.price:
-                return True
-                
-        # For stop orders, check price
-        if order.order_type == OrderType.STOP:
-            if order.side == OrderSide.BUY and bar.high >= order.stop_price:
-                return True
-            elif order.side == OrderSide.SELL and bar.low <= order.stop_price:
-                return True
-                
-        # For stop-limit orders, check if stop price is reached
-        if order.order_type == OrderType.STOP_LIMIT:
-            if order.side == OrderSide.BUY and bar.high >= order.stop_price:
-                # Convert to limit order
-                order.order_type = OrderType.LIMIT
-                return self._should_execute_order(order, bar)
-            elif order.side == OrderSide.SELL and bar.low <= order.stop_price:
-                # Convert to limit order
-                order.order_type = OrderType.LIMIT
-                return self._should_execute_order(order, bar)
-                
-        return False
+        return _EXECUTION_CHECKS[order.order_type, order.side](order, bar)
         
     def _execute_order(self, order: Order, bar: Bar):
         """
@@ -277,82 +512,80 @@ class BacktestExecutionProvider(ExecutionProvider):
             bar: Current market data for the order's symbol
         """
         # Determine execution price
-        if order.order_type == OrderType.MARKET:
-            # Use the open price for market orders
-            execution_price = bar.open
-        elif order.order_type == OrderType.LIMIT:
-            # Use the limit price for limit orders
-            execution_price = order.price
-        elif order.order_type == OrderType.STOP:
-            # Use the stop price for stop orders
-            execution_price = order.stop_price
-        else:
-            # Shouldn't happen, but use the current price as a fallback
-            execution_price = bar.close
+        execution_price = _EXECUTION_PRICES.get(order.order_type, _close_price)(order, bar)
             
         # Calculate commission
         commission = order.quantity * execution_price * self.commission_rate
         
         # Update cash and positions
+        symbol = order.symbol
+        position = self.positions.get(symbol)
         if order.side == OrderSide.BUY:
             # Check if we have enough cash
             cost = order.quantity * execution_price + commission
             if cost > self.cash:
                 # Reject order if not enough cash
                 order.status = OrderStatus.REJECTED
-                order.updated_at = datetime.now()
-                self.notify_order_update(order)
-                self.logger.warning(f"Order {order.id} rejected: insufficient funds")
+                order.updated_at = self._now()
+                self._scan_orders.pop(order.id, None)
+                self._pending_order_updates.append(order)
+                self.logger.warning("Order %s rejected: insufficient funds", order.id)
                 return
                 
             # Update cash
             self.cash -= cost
             
             # Update position
-            if order.symbol in self.positions:
-                position = self.positions[order.symbol]
+            if position is not None:
                 # Calculate new average entry price
                 total_cost = (position.quantity * position.average_entry_price) + (order.quantity * execution_price)
                 total_quantity = position.quantity + order.quantity
                 position.average_entry_price = total_cost / total_quantity
+                self._reprice(position, bar.close)
                 position.quantity = total_quantity
-                position.current_price = bar.close
+                self._market_value += order.quantity * bar.close
             else:
                 # Create new position
-                self.positions[order.symbol] = Position(
-                    symbol=order.symbol,
+                self.positions[symbol] = Position(
+                    symbol=symbol,
                     quantity=order.quantity,
                     average_entry_price=execution_price,
                     current_price=bar.close
                 )
+                self._market_value += order.quantity * bar.close
         else:  # SELL
             # Check if we have enough shares
-            position = self.positions.get(order.symbol)
             if position is None or position.quantity < order.quantity:
                 # Reject order if not enough shares
                 order.status = OrderStatus.REJECTED
-                order.updated_at = datetime.now()
-                self.notify_order_update(order)
-                self.logger.warning(f"Order {order.id} rejected: insufficient shares")
+                order.updated_at = self._now()
+                self._scan_orders.pop(order.id, None)
+                self._pending_order_updates.append(order)
+                self.logger.warning("Order %s rejected: insufficient shares", order.id)
                 return
                 
             # Update cash
             self.cash += order.quantity * execution_price - commission
             
             # Update position
+            self._reprice(position, bar.close)
             position.quantity -= order.quantity
-            position.current_price = bar.close
+            self._market_value -= order.quantity * bar.close
             
             # Remove position if quantity is zero
             if position.quantity == 0:
-                del self.positions[order.symbol]
+                del self.positions[symbol]
+                if not self.positions:
+                    # Drop rounding error accumulated in the running total
+                    self._market_value = 0.0
                 
         # Update order
         order.status = OrderStatus.FILLED
         order.filled_quantity = order.quantity
         order.average_fill_price = execution_price
-        order.updated_at = datetime.now()
-        self.notify_order_update(order)
+        order.updated_at = self._now()
+        self._scan_orders.pop(order.id, None)
+        self._pending_order_updates.append(order)
         
         # Create trade
         trade = Trade(
@@ -364,9 +597,26 @@ class BacktestExecutionProvider(ExecutionProvider):
             order_id=order.id
         )
         self.trades.append(trade)
-        self.notify_trade(trade)
+        self._pending_trades.append(trade)
+        
+        self.logger.info("Order executed: %s %s %s %s @ %s", order.id, order.side.name, order.quantity,
+                         order.symbol, execution_price)
+        
+    def run_batch(self, ohlc: np.ndarray, orders: np.ndarray) -> VectorizedBacktestResult:
+        """
+        Simulate a list of orders known up front with the vectorized backtest.
         
-        self.logger.info(f"Order executed: {order.id} {order.side.name} {order.quantity} {order.symbol} @ {execution_price}")
+        Uses this provider's initial cash and commission rate. The provider's
+        own orders, positions and trades are not changed.
+        
+        Args:
+            ohlc: Open, high, low and close prices, shape (bars, symbols, 4)
+            orders: Orders to simulate, an array of ORDER_DTYPE
+            
+        Returns:
+            VectorizedBacktestResult with the fills and the portfolio over time
+        """
+        return run_vectorized_backtest(ohlc, orders, self.initial_cash, self.commission_rate)
         
     def get_performance_metrics(self) -> Dict[str, Any]:
         """
@@ -386,12 +636,13 @@ class BacktestExecutionProvider(ExecutionProvider):
         num_trades = len(self.trades)
         
         # Calculate win/loss ratio
-        winning_trades = [
-            trade for trade in self.trades
-            if (trade.side == OrderSide.BUY and trade.price < self.positions.get(trade.symbol, Position(trade.symbol, 0, 0)).average_entry_price) or
-               (trade.side == OrderSide.SELL and trade.price > self.positions.get(trade.symbol, Position(trade.symbol, 0, 0)).average_entry_price)
-        ]
-        win_ratio = len(winning_trades) / num_trades if num_trades > 0 else 0
+        entry_by_symbol = {symbol: pos.average_entry_price for symbol, pos in self.positions.items()}
+        winning_trades = 0
+        for trade in self.trades:
+            entry_price = entry_by_symbol.get(trade.symbol, 0)
+            if (trade.price < entry_price) if trade.side == OrderSide.BUY else (trade.price > entry_price):
+                winning_trades += 1
+        win_ratio = winning_trades / num_trades if num_trades > 0 else 0
         
         return {
             'initial_cash': self.initial_cash,
@@ -5,7 +5,9 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime
 
-from easytrade.core.types import Order, OrderType, OrderSide, TimeInForce, Position, Portfolio, Trade
+from easytrade.core.types import (
+    Order, OrderRequest, OrderType, OrderSide, TimeInForce, Position, Portfolio, Trade, Bar, BarBatch
+)
 
 
 class ExecutionProvider(ABC):
@@ -18,8 +20,9 @@ class ExecutionProvider(ABC):
     
     def __init__(self):
         """Initialize the execution provider."""
-        self._order_callbacks = []
-        self._trade_callbacks = []
+        # Dictionaries used as ordered sets of callbacks
+        self._order_callbacks = {}
+        self._trade_callbacks = {}
         
     def add_order_callback(self, callback):
         """
@@ -28,8 +31,7 @@ class ExecutionProvider(ABC):
         Args:
             callback: Function to call with order updates
         """
-        if callback not in self._order_callbacks:
-            self._order_callbacks.append(callback)
+        self._order_callbacks[callback] = None
             
     def remove_order_callback(self, callback):
         """
@@ -38,8 +40,7 @@ class ExecutionProvider(ABC):
         Args:
             callback: Callback to remove
         """
-        if callback in self._order_callbacks:
-            self._order_callbacks.remove(callback)
+        self._order_callbacks.pop(callback, None)
             
     def add_trade_callback(self, callback):
         """
@@ -48,8 +49,7 @@ class ExecutionProvider(ABC):
         Args:
             callback: Function to call with trade updates
         """
-        if callback not in self._trade_callbacks:
-            self._trade_callbacks.append(callback)
+        self._trade_callbacks[callback] = None
             
     def remove_trade_callback(self, callback):
         """
@@ -58,8 +58,7 @@ class ExecutionProvider(ABC):
         Args:
             callback: Callback to remove
         """
-        if callback in self._trade_callbacks:
-            self._trade_callbacks.remove(callback)
+        self._trade_callbacks.pop(callback, None)
             
     def notify_order_update(self, order: Order):
         """
@@ -81,6 +80,69 @@ class ExecutionProvider(ABC):
         for callback in self._trade_callbacks:
             callback(trade)
             
+    def notify_order_updates(self, orders: List[Order]):
+        """
+        Notify all order callbacks of several order updates at once.
+        
+        Callbacks with a true supports_batch attribute are called once with the
+        whole list; all others are called once per order.
+        
+        Args:
+            orders: Updated orders, in the order the updates happened
+        """
+        if not orders:
+            return
+            
+        for callback in self._order_callbacks:
+            if getattr(callback, 'supports_batch', False):
+                callback(orders)
+            else:
+                for order in orders:
+                    callback(order)
+                    
+    def notify_trades(self, trades: List[Trade]):
+        """
+        Notify all trade callbacks of several trades at once.
+        
+        Callbacks with a true supports_batch attribute are called once with the
+        whole list; all others are called once per trade.
+        
+        Args:
+            trades: Trades that occurred, in order
+        """
+        if not trades:
+            return
+            
+        for callback in self._trade_callbacks:
+            if getattr(callback, 'supports_batch', False):
+                callback(trades)
+            else:
+                for trade in trades:
+                    callback(trade)
+                    
+    def process_market_data(self, data: Dict[str, Bar]):
+        """
+        Process market data and update orders and positions.
+        
+        Simulated providers override this to fill orders; providers connected
+        to a broker can ignore it.
+        
+        Args:
+            data: Dictionary mapping symbol to Bar object
+        """
+        pass
+    
+    def process_market_data_batch(self, batch: BarBatch):
+        """
+        Process market data in array form.
+        
+        The default converts the batch and calls process_market_data.
+        
+        Args:
+            batch: OHLCV arrays for all symbols at this time step
+        """
+        self.process_market_data(batch.to_bars())
+    
     @abstractmethod
     def start(self):
         """Start the execution provider."""
@@ -114,6 +176,32 @@ class ExecutionProvider(ABC):
         """
         pass
     
+    def place_orders(self, requests: List[OrderRequest]) -> List[Order]:
+        """
+        Place a batch of orders.
+        
+        Providers that can submit several orders in one round trip should
+        override this; the default places each order in turn.
+        
+        Args:
+            requests: Order requests to place
+            
+        Returns:
+            List of Order objects, in the same order as the requests
+        """
+        return [
+            self.place_order(
+                symbol=request.symbol,
+                side=request.side,
+                quantity=request.quantity,
+                order_type=request.order_type,
+                price=request.price,
+                stop_price=request.stop_price,
+                time_in_force=request.time_in_force
+            )
+            for request in requests
+        ]
+    
     @abstractmethod
     def cancel_order(self, order_id: str) -> bool:
         """
@@ -0,0 +1,182 @@
+"""
+Vectorized backtest for order lists that are known up front.
+"""
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from easytrade.core.types import OrderType, OrderSide
+from easytrade.execution._backtest_kernels import NUMBA_AVAILABLE, match_orders
+
+
+# Layout of the order array accepted by run_vectorized_backtest
+ORDER_DTYPE = np.dtype([
+    ('bar', 'i8'),  # Bar at which the order is placed; it can fill from the next bar on
+    ('symbol', 'i8'),  # Column of the symbol in the price array
+    ('side', 'i1'),  # OrderSide value
+    ('order_type', 'i1'),  # OrderType value
+    ('quantity', 'f8'),
+    ('price', 'f8'),  # Limit price, NaN if not used
+    ('stop_price', 'f8'),  # Stop price, NaN if not used
+])
+
+# Columns of the last axis of the price array
+OPEN, HIGH, LOW, CLOSE = range(4)
+
+
+@dataclass
+class VectorizedBacktestResult:
+    """
+    Result of a vectorized backtest.
+    
+    Arrays indexed by order have one element per input order; arrays indexed
+    by bar have one row per bar.
+    """
+    fill_bars: np.ndarray  # Bar at which each order filled, -1 if it never filled
+    fill_prices: np.ndarray  # Execution price of each order, NaN if it never filled
+    commissions: np.ndarray  # Commission paid for each order
+    positions: np.ndarray  # Quantity held per bar and symbol, shape (bars, symbols)
+    cash: np.ndarray  # Cash after each bar
+    equity: np.ndarray  # Cash plus position value at the close of each bar
+
+
+def _first_true(condition: np.ndarray) -> int:
+    """
+    Find the first True element of a boolean array.
+    
+    Args:
+        condition: Boolean array
+    
+    Returns:
+        Index of the first True element, -1 if there is none
+    """
+    if len(condition) == 0:
+        return -1
+    index = int(np.argmax(condition))
+    return index if condition[index] else -1
+
+
+def _find_fill(ohlc: np.ndarray, order) -> tuple:
+    """
+    Find where and at which price an order fills.
+    
+    Applies the same rules as BacktestExecutionProvider: market orders fill
+    at the open, limit and stop-limit orders at the limit price, and stop
+    orders at the stop price.
+    
+    Args:
+        ohlc: Prices of the order's symbol from the first bar it can fill on,
+            shape (bars, 4)
+        order: Element of an ORDER_DTYPE array
+    
+    Returns:
+        Tuple of (offset of the fill bar into ohlc or -1, execution price)
+    """
+    is_buy = order['side'] == OrderSide.BUY
+    order_type = order['order_type']
+    
+    if order_type == OrderType.MARKET:
+        return (0, ohlc[0, OPEN]) if len(ohlc) else (-1, np.nan)
+    
+    if order_type == OrderType.STOP:
+        stop_price = order['stop_price']
+        triggered = ohlc[:, HIGH] >= stop_price if is_buy else ohlc[:, LOW] <= stop_price
+        return _first_true(triggered), stop_price
+    
+    price = order['price']
+    start = 0
+    if order_type == OrderType.STOP_LIMIT:
+        # The order becomes a limit order on the bar its stop price is reached
+        stop_price = order['stop_price']
+        start = _first_true(ohlc[:, HIGH] >= stop_price if is_buy else ohlc[:, LOW] <= stop_price)
+        if start < 0:
+            return -1, price
+    
+    limit_ohlc = ohlc[start:]
+    reached = limit_ohlc[:, LOW] <= price if is_buy else limit_ohlc[:, HIGH] >= price
+    offset = _first_true(reached)
+    return (start + offset if offset >= 0 else -1), price
+
+
+def run_vectorized_backtest(ohlc: np.ndarray, orders: np.ndarray, initial_cash: float = 100000.0,
+                            commission_rate: float = 0.001) -> VectorizedBacktestResult:
+    """
+    Simulate a list of orders over a full price history in array form.
+    
+    Order matching runs as a compiled loop when Numba is installed.
+    
+    This is a fast alternative to replaying bars through BacktestExecutionProvider
+    when all orders are known before the backtest starts, for example when they
+    are derived from precomputed signals. Fill prices follow the same rules as
+    the event-driven provider. Unlike that provider, orders are not rejected for
+    insufficient cash or shares, because each order is matched independently.
+    
+    Args:
+        ohlc: Open, high, low and close prices, shape (bars, symbols, 4)
+        orders: Orders to simulate, an array of ORDER_DTYPE
+        initial_cash: Initial cash balance
+        commission_rate: Commission rate as a decimal (e.g., 0.001 = 0.1%)
+    
+    Returns:
+        VectorizedBacktestResult with the fills and the portfolio over time
+    """
+    ohlc = np.asarray(ohlc, dtype=np.float64)
+    orders = np.asarray(orders, dtype=ORDER_DTYPE)
+    num_bars, num_symbols = ohlc.shape[:2]
+    
+    # Match each order against the bars after the one it was placed on
+    if NUMBA_AVAILABLE:
+        fill_bars, fill_prices = match_orders(
+            ohlc, orders['bar'], orders['symbol'], orders['side'],
+            orders['order_type'], orders['price'], orders['stop_price']
+        )
+    else:
+        fill_bars = np.full(len(orders), -1, dtype=np.int64)
+        fill_prices = np.full(len(orders), np.nan)
+        for i, order in enumerate(orders):
+            first_bar = order['bar'] + 1
+            offset, price = _find_fill(ohlc[first_bar:, order['symbol']], order)
+            if offset >= 0:
+                fill_bars[i] = first_bar + offset
+                fill_prices[i] = price
+    
+    filled = fill_bars >= 0
+    signs = np.where(orders['side'] == OrderSide.BUY, 1.0, -1.0)
+    signed_quantities = np.where(filled, signs * orders['quantity'], 0.0)
+    commissions = np.where(filled, orders['quantity'] * np.nan_to_num(fill_prices) * commission_rate, 0.0)
+    
+    # Accumulate position and cash changes at the fill bars
+    fill_rows = fill_bars[filled]
+    position_deltas = np.zeros((num_bars, num_symbols))
+    np.add.at(position_deltas, (fill_rows, orders['symbol'][filled]), signed_quantities[filled])
+    cash_deltas = np.zeros(num_bars)
+    np.add.at(cash_deltas, fill_rows,
+              -signed_quantities[filled] * fill_prices[filled] - commissions[filled])
+    
+    positions = np.cumsum(position_deltas, axis=0)
+    cash = initial_cash + np.cumsum(cash_deltas)
+    equity = cash + (positions * ohlc[:, :, CLOSE]).sum(axis=1)
+    
+    return VectorizedBacktestResult(
+        fill_bars=fill_bars,
+        fill_prices=fill_prices,
+        commissions=commissions,
+        positions=positions,
+        cash=cash,
+        equity=equity
+    )
+
+
+def stack_prices(prices: List[np.ndarray]) -> np.ndarray:
+    """
+    Stack per-symbol OHLC arrays into the layout used by run_vectorized_backtest.
+    
+    Args:
+        prices: One (bars, 4) open/high/low/close array per symbol, all covering
+            the same bars
+    
+    Returns:
+        Array of shape (bars, symbols, 4)
+    """
+    return np.stack([np.asarray(p, dtype=np.float64) for p in prices], axis=1)
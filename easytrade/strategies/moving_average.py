@@ -21,7 +21,7 @@ class MovingAverageCrossoverStrategy(Strategy):
     """
     
     def __init__(self, short_window: int = 10, long_window: int = 50, 
-                position_size: float = 1.0):
+                position_size: float = 1.0, ma_type: str = 'sma'):
         """
         Initialize the strategy.
         
@@ -29,23 +29,46 @@ class MovingAverageCrossoverStrategy(Strategy):
             short_window: Short-term moving average window
             long_window: Long-term moving average window
             position_size: Position size as a fraction of portfolio value
+            ma_type: 'sma' for simple or 'ema' for exponential moving averages.
+                Exponential averages are updated from the previous value alone,
+                so no close history is kept.
         """
         super().__init__()
+        if ma_type not in ('sma', 'ema'):
+            raise ValueError(f"Unknown moving average type: {ma_type}")
+            
         self.short_window = short_window
         self.long_window = long_window
         self.position_size = position_size
+        self.ma_type = ma_type
         
-        self._data = {}  # symbol -> List[Bar]
+        self._closes = {}  # symbol -> ring buffer of the last long_window + 1 closes
+        self._count = {}  # symbol -> number of bars received
+        self._last_close = {}  # symbol -> close of the latest bar
         self._signals = {}  # symbol -> signal (1 = buy, -1 = sell, 0 = hold)
         
+        # Running window sums and the moving averages at the current and previous bar
+        self._short_sum = {}  # symbol -> sum of the last short_window closes
+        self._long_sum = {}  # symbol -> sum of the last long_window closes
+        self._short_ma = {}  # symbol -> short moving average
+        self._long_ma = {}  # symbol -> long moving average
+        self._prev_short_ma = {}  # symbol -> short moving average at the previous bar
+        self._prev_long_ma = {}  # symbol -> long moving average at the previous bar
+        
     def on_start(self):
         """Called when the strategy starts running."""
-        self.logger.info(f"Starting MovingAverageCrossoverStrategy (short_window={self.short_window}, long_window={self.long_window})")
+        self.logger.info(f"Starting MovingAverageCrossoverStrategy (short_window={self.short_window}, long_window={self.long_window}, ma_type={self.ma_type})")
         
         # Initialize data and signals
         for symbol in self._symbols:
-            self._data[symbol] = []
+            if self.ma_type == 'sma':
+                self._closes[symbol] = np.empty(self.long_window + 1, dtype=np.float64)
+            self._count[symbol] = 0
             self._signals[symbol] = 0
+            self._short_sum[symbol] = 0.0
+            self._long_sum[symbol] = 0.0
+            self._short_ma[symbol] = None
+            self._long_ma[symbol] = None
             
     def on_data(self, data: Dict[str, Bar]):
         """
@@ -57,13 +80,130 @@ class MovingAverageCrossoverStrategy(Strategy):
         # Update data
         for symbol, bar in data.items():
             if symbol in self._symbols:
-                self._data[symbol].append(bar)
+                if self.ma_type == 'ema':
+                    self._update_exponential_averages(symbol, bar.close)
+                else:
+                    self._update_averages(symbol, bar.close)
                 
                 # Calculate signals if we have enough data
-                if len(self._data[symbol]) >= self.long_window:
+                if self._count[symbol] >= self.long_window:
                     self._calculate_signal(symbol)
                     self._execute_signal(symbol)
                     
+    def _update_averages(self, symbol: str, close: float):
+        """
+        Add a new close for a symbol and update its moving averages.
+        
+        The window sums are updated by adding the new close and subtracting the
+        close that leaves the window. Until a window is full, its average is
+        taken over the closes available so far.
+        
+        Args:
+            symbol: Symbol to update
+            close: Close price of the new bar
+        """
+        closes = self._closes[symbol]
+        size = len(closes)
+        index = self._count[symbol]  # Position of the new close in the full history
+        count = index + 1
+        
+        self._prev_short_ma[symbol] = self._short_ma[symbol]
+        self._prev_long_ma[symbol] = self._long_ma[symbol]
+        
+        # The buffer holds long_window + 1 closes, so the evicted ones are still in it
+        short_sum = self._short_sum[symbol] + close
+        if count > self.short_window:
+            short_sum -= closes.item((index - self.short_window) % size)
+        long_sum = self._long_sum[symbol] + close
+        if count > self.long_window:
+            long_sum -= closes.item((index - self.long_window) % size)
+            
+        closes[index % size] = close
+        self._count[symbol] = count
+        self._last_close[symbol] = close
+        self._short_sum[symbol] = short_sum
+        self._long_sum[symbol] = long_sum
+        self._short_ma[symbol] = short_sum / min(count, self.short_window)
+        self._long_ma[symbol] = long_sum / min(count, self.long_window)
+        
+    def _update_exponential_averages(self, symbol: str, close: float):
+        """
+        Add a new close for a symbol and update its exponential moving averages.
+        
+        Each average is updated as alpha * close + (1 - alpha) * average with
+        alpha = 2 / (window + 1), starting from the first close.
+        
+        Args:
+            symbol: Symbol to update
+            close: Close price of the new bar
+        """
+        short_ma = self._short_ma[symbol]
+        long_ma = self._long_ma[symbol]
+        self._prev_short_ma[symbol] = short_ma
+        self._prev_long_ma[symbol] = long_ma
+        
+        if short_ma is None:
+            short_ma = long_ma = close
+        else:
+            short_alpha = 2.0 / (self.short_window + 1)
+            long_alpha = 2.0 / (self.long_window + 1)
+            short_ma += short_alpha * (close - short_ma)
+            long_ma += long_alpha * (close - long_ma)
+            
+        self._short_ma[symbol] = short_ma
+        self._long_ma[symbol] = long_ma
+        self._count[symbol] += 1
+        self._last_close[symbol] = close
+        
+    @staticmethod
+    def backtest_signals(closes: np.ndarray, short_window: Union[int, np.ndarray],
+                         long_window: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        Compute the crossover signals of a whole close series at once.
+        
+        Produces the same signals as feeding the closes to the strategy bar by
+        bar: averages are taken over the closes available until a window is
+        full, and signals start at the bar where long_window closes are known.
+        Passing arrays of windows evaluates all parameter sets in one pass,
+        which is useful for parameter sweeps.
+        
+        Args:
+            closes: Close prices, oldest first
+            short_window: Short-term moving average window, or array of windows
+            long_window: Long-term moving average window, or array of windows
+                with the same shape as short_window
+            
+        Returns:
+            Array of signals (1 = buy, -1 = sell, 0 = hold), shape (len(closes),)
+            for scalar windows or (parameter sets, len(closes)) for arrays
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        scalar = np.ndim(short_window) == 0 and np.ndim(long_window) == 0
+        short_windows = np.atleast_1d(short_window).astype(np.int64)[:, np.newaxis]
+        long_windows = np.atleast_1d(long_window).astype(np.int64)[:, np.newaxis]
+        
+        # Window sums from the cumulative sum, shared by all parameter sets
+        sums = np.concatenate(([0.0], np.cumsum(closes)))
+        counts = np.arange(1, len(closes) + 1)
+        
+        def moving_average(windows: np.ndarray) -> np.ndarray:
+            starts = np.maximum(counts - windows, 0)
+            return (sums[counts] - sums[starts]) / np.minimum(counts, windows)
+            
+        short_ma = moving_average(short_windows)
+        long_ma = moving_average(long_windows)
+        
+        prev_short_ma, prev_long_ma = short_ma[:, :-1], long_ma[:, :-1]
+        short_ma, long_ma = short_ma[:, 1:], long_ma[:, 1:]
+        buy = (prev_short_ma <= prev_long_ma) & (short_ma > long_ma)
+        sell = (prev_short_ma >= prev_long_ma) & (short_ma < long_ma)
+        
+        signals = np.zeros((len(short_windows), len(closes)), dtype=np.int8)
+        signals[:, 1:] = np.where(buy, 1, np.where(sell, -1, 0))
+        signals[counts < long_windows] = 0  # Not enough data yet
+        
+        return signals[0] if scalar else signals
+        
     def _calculate_signal(self, symbol: str):
         """
         Calculate trading signal for a symbol.
@@ -71,16 +211,11 @@ class MovingAverageCrossoverStrategy(Strategy):
         Args:
             symbol: Symbol to calculate signal for
         """
-        # Extract close prices
-        closes = [bar.close for bar in self._data[symbol]]
-        
-        # Calculate moving averages
-        short_ma = np.mean(closes[-self.short_window:])
-        long_ma = np.mean(closes[-self.long_window:])
-        
-        # Calculate previous moving averages
-        prev_short_ma = np.mean(closes[-self.short_window-1:-1])
-        prev_long_ma = np.mean(closes[-self.long_window-1:-1])
+        # Current and previous moving averages
+        short_ma = self._short_ma[symbol]
+        long_ma = self._long_ma[symbol]
+        prev_short_ma = self._prev_short_ma[symbol]
+        prev_long_ma = self._prev_long_ma[symbol]
         
         # Determine signal
         prev_signal = self._signals[symbol]
@@ -99,7 +234,7 @@ class MovingAverageCrossoverStrategy(Strategy):
         
         # Log signal
         if signal != 0:
-            self.logger.info(f"Signal for {symbol}: {signal} (short_ma={short_ma:.2f}, long_ma={long_ma:.2f})")
+            self.logger.info("Signal for %s: %d (short_ma=%.2f, long_ma=%.2f)", symbol, signal, short_ma, long_ma)
             
     def _execute_signal(self, symbol: str):
         """
@@ -121,7 +256,7 @@ class MovingAverageCrossoverStrategy(Strategy):
         
         # Calculate position size
         if portfolio.equity > 0:
-            current_price = self._data[symbol][-1].close
+            current_price = self._last_close[symbol]
             position_value = portfolio.equity * self.position_size
             quantity = position_value / current_price
             
@@ -133,7 +268,7 @@ class MovingAverageCrossoverStrategy(Strategy):
                         self.close(symbol)
                         
                     # Open long position
-                    self.logger.info(f"Buying {quantity:.2f} shares of {symbol} @ {current_price:.2f}")
+                    self.logger.info("Buying %.2f shares of %s @ %.2f", quantity, symbol, current_price)
                     # Use limit order with current price
                     self.buy(symbol, quantity, order_type=OrderType.LIMIT, price=current_price)
             elif signal < 0:  # Sell signal
@@ -144,7 +279,7 @@ class MovingAverageCrossoverStrategy(Strategy):
                         self.close(symbol)
                         
                     # Open short position
-                    self.logger.info(f"Selling {quantity:.2f} shares of {symbol} @ {current_price:.2f}")
+                    self.logger.info("Selling %.2f shares of %s @ %.2f", quantity, symbol, current_price)
                     # Use limit order with current price
                     self.sell(symbol, quantity, order_type=OrderType.LIMIT, price=current_price)
                     
@@ -155,7 +290,7 @@ class MovingAverageCrossoverStrategy(Strategy):
         Args:
             order: Updated order object
         """
-        self.logger.info(f"Order update: {order.id} {order.symbol} {order.side.name} {order.status.name}")
+        self.logger.info("Order update: %s %s %s %s", order.id, order.symbol, order.side.name, order.status.name)
         
     def on_stop(self):
         """Called when the strategy stops running."""
@@ -0,0 +1,65 @@
+"""
+Equity curve statistics kernel used by the performance utilities.
+
+equity_statistics computes the mean, standard deviation and downside deviation
+of the per-period returns, and the maximum drawdown, in a single pass over the
+equity curve instead of one NumPy pass per metric.
+"""
+from typing import Tuple
+
+import numpy as np
+
+from easytrade._numba import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True)
+def equity_statistics(equity: np.ndarray, risk_free_per_period: float) -> Tuple[float, float, float, float]:
+    """
+    Calculate the return statistics and maximum drawdown of an equity curve in one pass.
+    
+    Standard deviations use one degree of freedom, like the NumPy
+    implementations, and are NaN when there are fewer than two values.
+    
+    Args:
+        equity: Array of equity values over time
+        risk_free_per_period: Risk-free rate per period, subtracted from each return
+    
+    Returns:
+        Tuple of (mean excess return, standard deviation of excess returns,
+        standard deviation of negative excess returns, maximum drawdown)
+    """
+    # Running mean and sum of squared deviations (Welford) for all and negative excess returns
+    count = 0
+    mean = 0.0
+    squares = 0.0
+    downside_count = 0
+    downside_mean = 0.0
+    downside_squares = 0.0
+    
+    peak = equity[0]
+    max_drawdown = 0.0
+    
+    for i in range(1, equity.shape[0]):
+        value = equity[i]
+        excess = (value - equity[i - 1]) / equity[i - 1] - risk_free_per_period
+        
+        count += 1
+        delta = excess - mean
+        mean += delta / count
+        squares += delta * (excess - mean)
+        
+        if excess < 0:
+            downside_count += 1
+            delta = excess - downside_mean
+            downside_mean += delta / downside_count
+            downside_squares += delta * (excess - downside_mean)
+            
+        if value > peak:
+            peak = value
+        drawdown = (peak - value) / peak
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+            
+    std = np.sqrt(squares / (count - 1)) if count > 1 else np.nan
+    downside_std = np.sqrt(downside_squares / (downside_count - 1)) if downside_count > 1 else np.nan
+    return (mean if count > 0 else np.nan), std, downside_std, max_drawdown
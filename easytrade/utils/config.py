@@ -2,10 +2,74 @@
 Utility functions for configuration management.
 """
 import os
+import copy
 import json
 import yaml
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+try:
+    import orjson
+    _HAVE_ORJSON = True
+except ImportError:  # orjson is an optional dependency
+    _HAVE_ORJSON = False
+
+try:
+    from yaml import CSafeLoader as _YamlLoader, CDumper as _YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader, Dumper as _YamlDumper
+
+
+# Buffer size for streamed config writes, so many small chunks become few write calls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Parsed config files, keyed by (absolute path, modification time, size)
+_CONFIG_CACHE_SIZE = 64
+_config_cache = OrderedDict()
+
+
+def _load_cached(file_path: str, parse: Callable[[bytes], Any]) -> Any:
+    """
+    Parse a config file, reusing the previous result if the file is unchanged.
+    
+    A file counts as unchanged while its modification time and size stay the
+    same. Callers get a deep copy, so changing it does not affect the cache.
+    The file is read with a single call and parsed from bytes.
+    
+    Args:
+        file_path: Path to the configuration file
+        parse: Function parsing the raw file contents
+        
+    Returns:
+        Parsed configuration
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    
+    if key in _config_cache:
+        _config_cache.move_to_end(key)
+        config = _config_cache[key]
+    else:
+        with open(file_path, 'rb') as f:
+            config = parse(f.read(stat.st_size))
+        _config_cache[key] = config
+        if len(_config_cache) > _CONFIG_CACHE_SIZE:
+            _config_cache.popitem(last=False)
+            
+    return copy.deepcopy(config)
+
+
+def _parse_json(data: bytes) -> Any:
+    """Parse JSON file contents, with orjson if it is installed."""
+    if _HAVE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _parse_yaml(data: bytes) -> Any:
+    """Parse YAML file contents, with the libyaml loader if it is available."""
+    return yaml.load(data, Loader=_YamlLoader)
 
 
 def load_json_config(file_path: str) -> Dict[str, Any]:
@@ -19,9 +83,7 @@ def load_json_config(file_path: str) -> Dict[str, Any]:
         Configuration dictionary
     """
     try:
-        with open(file_path, 'r') as f:
-            config = json.load(f)
-        return config
+        return _load_cached(file_path, _parse_json)
     except Exception as e:
         logging.error(f"Error loading JSON config from {file_path}: {e}")
         return {}
@@ -38,9 +100,7 @@ def load_yaml_config(file_path: str) -> Dict[str, Any]:
         Configuration dictionary
     """
     try:
-        with open(file_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config
+        return _load_cached(file_path, _parse_yaml)
     except Exception as e:
         logging.error(f"Error loading YAML config from {file_path}: {e}")
         return {}
@@ -60,11 +120,17 @@ def save_json_config(config: Dict[str, Any], file_path: str) -> bool:
     try:
         # Create directory if it doesn't exist
         directory = os.path.dirname(file_path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
             
-        with open(file_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        if _HAVE_ORJSON:
+            # orjson only supports two-space indentation
+            options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(config, option=options))
+        else:
+            with open(file_path, 'w', buffering=_WRITE_BUFFER_SIZE) as f:
+                json.dump(config, f, indent=4)
         return True
     except Exception as e:
         logging.error(f"Error saving JSON config to {file_path}: {e}")
@@ -85,17 +151,22 @@ def save_yaml_config(config: Dict[str, Any], file_path: str) -> bool:
     try:
         # Create directory if it doesn't exist
         directory = os.path.dirname(file_path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
             
-        with open(file_path, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+        with open(file_path, 'w', buffering=_WRITE_BUFFER_SIZE) as f:
+            yaml.dump(config, f, Dumper=_YamlDumper, default_flow_style=False)
         return True
     except Exception as e:
         logging.error(f"Error saving YAML config to {file_path}: {e}")
         return False
 
 
+# File extension -> config loader and saver
+_LOADERS = {'.json': load_json_config, '.yaml': load_yaml_config, '.yml': load_yaml_config}
+_SAVERS = {'.json': save_json_config, '.yaml': save_yaml_config, '.yml': save_yaml_config}
+
+
 def load_config(file_path: str) -> Dict[str, Any]:
     """
     Load configuration from a file (JSON or YAML).
@@ -106,13 +177,11 @@ def load_config(file_path: str) -> Dict[str, Any]:
     Returns:
         Configuration dictionary
     """
-    if file_path.endswith('.json'):
-        return load_json_config(file_path)
-    elif file_path.endswith(('.yaml', '.yml')):
-        return load_yaml_config(file_path)
-    else:
+    loader = _LOADERS.get(os.path.splitext(file_path)[1])
+    if loader is None:
         logging.error(f"Unsupported config file format: {file_path}")
         return {}
+    return loader(file_path)
 
 
 def save_config(config: Dict[str, Any], file_path: str) -> bool:
@@ -126,13 +195,11 @@ def save_config(config: Dict[str, Any], file_path: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    if file_path.endswith('.json'):
-        return save_json_config(config, file_path)
-    elif file_path.endswith(('.yaml', '.yml')):
-        return save_yaml_config(config, file_path)
-    else:
+    saver = _SAVERS.get(os.path.splitext(file_path)[1])
+    if saver is None:
         logging.error(f"Unsupported config file format: {file_path}")
         return False
+    return saver(config, file_path)
 
 
 def merge_configs(base_config: Dict[str, Any], override_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -148,12 +215,19 @@ def merge_configs(base_config: Dict[str, Any], override_config: Dict[str, Any])
     """
     result = base_config.copy()
     
-    for key, value in override_config.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_configs(result[key], value)
-        else:
-            result[key] = value
-            
+    # Walk nested dicts present in both configs with an explicit stack,
+    # copying only the levels that are merged
+    stack = [(result, override_config)]
+    while stack:
+        target, override = stack.pop()
+        for key, value in override.items():
+            current = target.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                current = target[key] = current.copy()
+                stack.append((current, value))
+            else:
+                target[key] = value
+                
     return result
 
 
@@ -168,13 +242,57 @@ class Config:
             config_file: Path to configuration file (optional)
             defaults: Default configuration values (optional)
         """
+        self._init(config_file, defaults, load_config)
+        
+    def _init(self, config_file: Optional[str], defaults: Optional[Dict[str, Any]],
+              loader: Callable[[str], Dict[str, Any]]):
+        """
+        Set up the configuration, loading config_file with the given loader.
+        
+        Args:
+            config_file: Path to configuration file (optional)
+            defaults: Default configuration values (optional)
+            loader: Function loading the configuration file
+        """
         self.config_file = config_file
         self.config = defaults or {}
         
         if config_file and os.path.exists(config_file):
-            loaded_config = load_config(config_file)
+            loaded_config = loader(config_file)
             self.config = merge_configs(self.config, loaded_config)
             
+    @classmethod
+    def from_json(cls, config_file: str, defaults: Optional[Dict[str, Any]] = None) -> 'Config':
+        """
+        Create a configuration manager from a JSON file, whatever its extension.
+        
+        Args:
+            config_file: Path to JSON configuration file
+            defaults: Default configuration values (optional)
+            
+        Returns:
+            Config object
+        """
+        config = cls.__new__(cls)
+        config._init(config_file, defaults, load_json_config)
+        return config
+        
+    @classmethod
+    def from_yaml(cls, config_file: str, defaults: Optional[Dict[str, Any]] = None) -> 'Config':
+        """
+        Create a configuration manager from a YAML file, whatever its extension.
+        
+        Args:
+            config_file: Path to YAML configuration file
+            defaults: Default configuration values (optional)
+            
+        Returns:
+            Config object
+        """
+        config = cls.__new__(cls)
+        config._init(config_file, defaults, load_yaml_config)
+        return config
+        
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get a configuration value.
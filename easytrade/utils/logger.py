@@ -1,14 +1,77 @@
 """
 Utility functions for logging.
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import time
 from datetime import datetime
 
 
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter that formats the date and time part of asctime once per second.
+    
+    Records logged within the same second reuse the cached string and only
+    add their milliseconds, which saves a strftime call per record.
+    """
+    
+    def __init__(self, fmt: str = None, datefmt: str = None):
+        """
+        Initialize the formatter.
+        
+        Args:
+            fmt: Record format string
+            datefmt: Date format string (defaults to the logging default)
+        """
+        super().__init__(fmt, datefmt)
+        self._cached_time = (None, None)  # (second, formatted date and time)
+        
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        """
+        Format the creation time of a record.
+        
+        Args:
+            record: Log record
+            datefmt: Date format string (optional)
+            
+        Returns:
+            Formatted time
+        """
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = time.strftime(datefmt or self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, formatted)
+            
+        if datefmt or not self.default_msec_format:
+            return formatted
+        return self.default_msec_format % (formatted, record.msecs)
+
+
+# Formatter shared by all loggers set up here
+_FORMATTER = _CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Running queue listeners, keyed by logger name
+_queue_listeners = {}
+
+
+def _stop_queue_listeners():
+    """Stop all queue listeners, writing out the records still queued."""
+    for listener in _queue_listeners.values():
+        listener.stop()
+    _queue_listeners.clear()
+
+
+atexit.register(_stop_queue_listeners)
+
+
 def setup_logger(name: str = None, log_level: int = logging.INFO,
-                log_file: str = None, console_output: bool = True) -> logging.Logger:
+                log_file: str = None, console_output: bool = True,
+                use_queue: bool = False) -> logging.Logger:
     """
     Set up a logger with the specified configuration.
     
@@ -17,6 +80,9 @@ def setup_logger(name: str = None, log_level: int = logging.INFO,
         log_level: Logging level (defaults to INFO)
         log_file: Path to log file (optional)
         console_output: Whether to output logs to console
+        use_queue: Only queue records in the logging thread and format and write
+            them from a background thread. Queued records are written out at exit.
+            Records logged from forked processes are not written.
         
     Returns:
         Configured logger
@@ -28,29 +94,40 @@ def setup_logger(name: str = None, log_level: int = logging.INFO,
     # Remove existing handlers
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    listener = _queue_listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
         
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    formatter = _FORMATTER
+    handlers = []
     
     # Add file handler if specified
     if log_file:
         # Create directory if it doesn't exist
         log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
             
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
         
     # Add console handler if specified
     if console_output:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
         
+    if use_queue and handlers:
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers)
+        listener.start()
+        _queue_listeners[name] = listener
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+            
     return logger
 
 
@@ -66,8 +143,7 @@ def setup_trading_logger(strategy_name: str, log_dir: str = 'logs') -> logging.L
         Configured logger
     """
     # Create log directory if it doesn't exist
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
         
     # Create log file name with timestamp
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
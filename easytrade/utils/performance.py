@@ -1,12 +1,20 @@
 """
 Utility functions for performance analysis.
 """
+import hashlib
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from collections import OrderedDict
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime, timedelta
 
+from easytrade.utils._performance_kernels import NUMBA_AVAILABLE, equity_statistics
+
+
+# Metrics of recently scored equity curves, keyed by (curve digest, days, risk-free rate)
+_METRICS_CACHE_SIZE = 256
+_metrics_cache = OrderedDict()
+
 
 def calculate_returns(equity_curve: List[float]) -> np.ndarray:
     """
@@ -18,7 +26,7 @@ def calculate_returns(equity_curve: List[float]) -> np.ndarray:
     Returns:
         Array of returns
     """
-    equity_array = np.array(equity_curve)
+    equity_array = np.asarray(equity_curve, dtype=np.float64)
     returns = np.diff(equity_array) / equity_array[:-1]
     return returns
 
@@ -61,6 +69,22 @@ def calculate_sortino_ratio(returns: np.ndarray, risk_free_rate: float = 0.0, an
     return np.sqrt(annualization_factor) * np.mean(excess_returns) / downside_deviation
 
 
+def _drawdown_series(equity_array: np.ndarray) -> np.ndarray:
+    """
+    Calculate the drawdown from the running peak at each point of an equity curve.
+    
+    Args:
+        equity_array: Array of equity values over time
+        
+    Returns:
+        Array of drawdowns as fractions of the peak
+    """
+    peak = np.maximum.accumulate(equity_array)
+    drawdown = peak - equity_array
+    drawdown /= peak
+    return drawdown
+
+
 def calculate_max_drawdown(equity_curve: List[float]) -> float:
     """
     Calculate maximum drawdown.
@@ -71,10 +95,7 @@ def calculate_max_drawdown(equity_curve: List[float]) -> float:
     Returns:
         Maximum drawdown as a percentage
     """
-    equity_array = np.array(equity_curve)
-    peak = np.maximum.accumulate(equity_array)
-    drawdown = (peak - equity_array) / peak
-    return np.max(drawdown)
+    return np.max(_drawdown_series(np.asarray(equity_curve, dtype=np.float64)))
 
 
 def calculate_cagr(equity_curve: List[float], days: int) -> float:
@@ -99,6 +120,9 @@ def calculate_performance_metrics(equity_curve: List[float], days: int, risk_fre
     """
     Calculate performance metrics.
     
+    Results are cached by a digest of the equity curve, so scoring the same
+    curve again, as parameter sweeps often do, only costs the hash.
+    
     Args:
         equity_curve: List of equity values over time
         days: Number of days in the backtest
@@ -107,13 +131,66 @@ def calculate_performance_metrics(equity_curve: List[float], days: int, risk_fre
     Returns:
         Dictionary of performance metrics
     """
-    returns = calculate_returns(equity_curve)
+    equity_array = np.ascontiguousarray(equity_curve, dtype=np.float64)
+    key = (hashlib.blake2b(equity_array, digest_size=16).digest(), days, risk_free_rate)
+    
+    metrics = _metrics_cache.get(key)
+    if metrics is None:
+        metrics = _metrics_cache[key] = _calculate_performance_metrics(equity_array, days, risk_free_rate)
+        if len(_metrics_cache) > _METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+    else:
+        _metrics_cache.move_to_end(key)
+        
+    return dict(metrics)
+
+
+def _calculate_performance_metrics(equity_array: np.ndarray, days: int,
+                                   risk_free_rate: float) -> Dict[str, float]:
+    """
+    Calculate performance metrics without the cache.
+    
+    Args:
+        equity_array: Array of equity values over time
+        days: Number of days in the backtest
+        risk_free_rate: Risk-free rate (annualized)
+        
+    Returns:
+        Dictionary of performance metrics
+    """
+    if NUMBA_AVAILABLE:
+        # One compiled pass over the curve instead of several NumPy passes
+        annualization_factor = 252
+        mean, std, downside_deviation, max_drawdown = equity_statistics(
+            equity_array, risk_free_rate / annualization_factor
+        )
+        sharpe = np.sqrt(annualization_factor) * mean / std
+        sortino = np.inf if downside_deviation == 0 else np.sqrt(annualization_factor) * mean / downside_deviation
+        return _performance_metrics(equity_array, sharpe, sortino, max_drawdown, days)
+        
+    returns = calculate_returns(equity_array)
+    return _performance_metrics(equity_array, calculate_sharpe_ratio(returns, risk_free_rate),
+                                calculate_sortino_ratio(returns, risk_free_rate),
+                                np.max(_drawdown_series(equity_array)), days)
+
+
+def _performance_metrics(equity_array: np.ndarray, sharpe: float, sortino: float,
+                         max_drawdown: float, days: int) -> Dict[str, float]:
+    """
+    Assemble performance metrics from precomputed ratios and maximum drawdown.
     
-    total_return = (equity_curve[-1] / equity_curve[0]) - 1
-    cagr = calculate_cagr(equity_curve, days)
-    sharpe = calculate_sharpe_ratio(returns, risk_free_rate)
-    sortino = calculate_sortino_ratio(returns, risk_free_rate)
-    max_drawdown = calculate_max_drawdown(equity_curve)
+    Args:
+        equity_array: Array of equity values over time
+        sharpe: Sharpe ratio of the equity curve
+        sortino: Sortino ratio of the equity curve
+        max_drawdown: Maximum drawdown of the equity curve
+        days: Number of days in the backtest
+        
+    Returns:
+        Dictionary of performance metrics
+    """
+    total_return = (equity_array[-1] / equity_array[0]) - 1
+    cagr = calculate_cagr(equity_array, days)
     
     return {
         'total_return': total_return,
@@ -125,6 +202,39 @@ def calculate_performance_metrics(equity_curve: List[float], days: int, risk_fre
     }
 
 
+# Most points drawn per line: two per pixel column of a 12 inch wide figure at 100 dpi
+_MAX_PLOT_POINTS = 12 * 100 * 2
+
+
+def _downsample(values: np.ndarray, timestamps: Optional[List[datetime]],
+                reducers: List[np.ufunc]) -> tuple:
+    """
+    Reduce a long series to about _MAX_PLOT_POINTS points for plotting.
+    
+    The series is split into equal bins and each reducer contributes one point
+    per bin, so np.minimum and np.maximum together keep the envelope of the line.
+    Each point is placed at the timestamp of its bin's start, or at its index
+    when there are no timestamps, so the x-axis keeps the original scale.
+    
+    Args:
+        values: Values to plot
+        timestamps: Timestamps of the values, or None
+        reducers: ufuncs whose reduceat gives the points of each bin
+        
+    Returns:
+        Tuple of (values, x values) to plot, where the x values are None if the
+        series was not reduced and has no timestamps
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= _MAX_PLOT_POINTS:
+        return values, timestamps
+        
+    starts = np.linspace(0, len(values), _MAX_PLOT_POINTS // len(reducers), endpoint=False).astype(np.int64)
+    sampled = np.column_stack([reducer.reduceat(values, starts) for reducer in reducers]).ravel()
+    positions = np.asarray(timestamps)[starts] if timestamps is not None else starts
+    return sampled, np.repeat(positions, len(reducers))
+
+
 def plot_equity_curve(equity_curve: List[float], timestamps: List[datetime] = None, title: str = 'Equity Curve'):
     """
     Plot equity curve.
@@ -134,14 +244,19 @@ def plot_equity_curve(equity_curve: List[float], timestamps: List[datetime] = No
         timestamps: List of timestamps corresponding to equity values
         title: Plot title
     """
+    import matplotlib.pyplot as plt
+    
+    # Long curves are reduced to their per-bin low and high
+    x_label = 'Date' if timestamps is not None else 'Time'
+    equity_curve, x = _downsample(equity_curve, timestamps, [np.minimum, np.maximum])
+    
     plt.figure(figsize=(12, 6))
     
-    if timestamps is not None:
-        plt.plot(timestamps, equity_curve)
-        plt.xlabel('Date')
+    if x is not None:
+        plt.plot(x, equity_curve)
     else:
         plt.plot(equity_curve)
-        plt.xlabel('Time')
+    plt.xlabel(x_label)
         
     plt.ylabel('Equity')
     plt.title(title)
@@ -151,7 +266,8 @@ def plot_equity_curve(equity_curve: List[float], timestamps: List[datetime] = No
     return plt.gcf()
 
 
-def plot_drawdown(equity_curve: List[float], timestamps: List[datetime] = None, title: str = 'Drawdown'):
+def plot_drawdown(equity_curve: List[float], timestamps: List[datetime] = None, title: str = 'Drawdown',
+                  drawdown: Optional[np.ndarray] = None):
     """
     Plot drawdown.
     
@@ -159,19 +275,24 @@ def plot_drawdown(equity_curve: List[float], timestamps: List[datetime] = None,
         equity_curve: List of equity values over time
         timestamps: List of timestamps corresponding to equity values
         title: Plot title
+        drawdown: Drawdown series of equity_curve, if already calculated (optional)
     """
-    equity_array = np.array(equity_curve)
-    peak = np.maximum.accumulate(equity_array)
-    drawdown = (peak - equity_array) / peak
+    import matplotlib.pyplot as plt
+    
+    if drawdown is None:
+        drawdown = _drawdown_series(np.asarray(equity_curve, dtype=np.float64))
+        
+    # Long series are reduced to their per-bin maximum, which keeps the maximum drawdown
+    x_label = 'Date' if timestamps is not None else 'Time'
+    drawdown, x = _downsample(drawdown, timestamps, [np.maximum])
     
     plt.figure(figsize=(12, 6))
     
-    if timestamps is not None:
-        plt.plot(timestamps, drawdown)
-        plt.xlabel('Date')
+    if x is not None:
+        plt.plot(x, drawdown)
     else:
         plt.plot(drawdown)
-        plt.xlabel('Time')
+    plt.xlabel(x_label)
         
     plt.ylabel('Drawdown')
     plt.title(title)
@@ -189,6 +310,8 @@ def plot_returns_distribution(returns: np.ndarray, title: str = 'Returns Distrib
         returns: Array of returns
         title: Plot title
     """
+    import matplotlib.pyplot as plt
+    
     plt.figure(figsize=(12, 6))
     
     plt.hist(returns, bins=50, alpha=0.75)
@@ -217,11 +340,15 @@ def create_performance_report(equity_curve: List[float], timestamps: List[dateti
     Returns:
         Dictionary containing performance metrics and plots
     """
-    metrics = calculate_performance_metrics(equity_curve, days, risk_free_rate)
-    returns = calculate_returns(equity_curve)
+    # Returns and drawdown are calculated once and shared by the metrics and plots
+    equity_array = np.asarray(equity_curve, dtype=np.float64)
+    returns = calculate_returns(equity_array)
+    drawdown = _drawdown_series(equity_array)
+    metrics = _performance_metrics(equity_array, calculate_sharpe_ratio(returns, risk_free_rate),
+                                   calculate_sortino_ratio(returns, risk_free_rate), np.max(drawdown), days)
     
-    equity_plot = plot_equity_curve(equity_curve, timestamps)
-    drawdown_plot = plot_drawdown(equity_curve, timestamps)
+    equity_plot = plot_equity_curve(equity_array, timestamps)
+    drawdown_plot = plot_drawdown(equity_array, timestamps, drawdown=drawdown)
     returns_plot = plot_returns_distribution(returns)
     
     return {
@@ -3,15 +3,12 @@
 Example script to run a backtest using the EasyTrade framework.
 """
 import os
-import sys
 import logging
+import numpy as np
 import argparse
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
-# Add parent directory to path to import easytrade
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from easytrade.core.engine import TradingEngine
 from easytrade.core.risk_manager import RiskManager
 from easytrade.data.csv_provider import CSVDataProvider
@@ -58,8 +55,7 @@ def main():
     logger = setup_logger('backtest', log_level=log_level)
     
     # Create output directory if it doesn't exist
-    if not os.path.exists(args.output_dir):
-        os.makedirs(args.output_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
     
     # Create components
     data_provider = CSVDataProvider(args.data_dir)
@@ -113,6 +109,32 @@ def main():
     # Set replay speed (faster for backtesting)
     data_provider.set_replay_speed(10.0)
     
+    # Create equity curve, with one point per replay step of the longest symbol
+    num_points = max(data_provider.snapshot_data_stats().values(), default=0)
+    equity_curve = np.empty(num_points, dtype=np.float64)
+    timestamps = np.empty(num_points, dtype='datetime64[ns]')
+    num_recorded = 0
+    
+    # Timestamp recorded for a step without any bars, taken once instead of on every step
+    fallback_timestamp = datetime.now()
+    
+    # Set up callback to record equity curve
+    def record_equity(data):
+        nonlocal num_recorded
+        logger.debug("record_equity callback called with data for %d symbols", len(data))
+        if num_recorded == num_points:
+            return
+        portfolio = execution_provider.get_portfolio()
+        equity_curve[num_recorded] = portfolio.equity
+        first_bar = next(iter(data.values()), None)
+        timestamps[num_recorded] = first_bar.timestamp if first_bar is not None else fallback_timestamp
+        num_recorded += 1
+        logger.debug("Added equity point: %s at %s", portfolio.equity, timestamps[num_recorded - 1])
+    
+    # Add callback to data provider, after the engine so it sees the updated portfolio
+    data_provider.add_subscriber(record_equity)
+    logger.debug("Added record_equity callback to data provider")
+    
     # Run backtest
     logger.info("Starting backtest")
     engine.run_backtest()
@@ -128,42 +150,16 @@ def main():
     logger.info(f"Number of trades: {metrics['num_trades']}")
     logger.info(f"Win ratio: {metrics['win_ratio']:.2f}")
     
-    # Create equity curve
-    equity_curve = []
-    timestamps = []
-    
-    # Reset data provider and execution provider
-    data_provider.reset()
-    execution_provider.reset()
-    
-    # Make sure engine is not running
-    if hasattr(engine, '_running') and engine._running:
-        logger.debug("Stopping engine before second run")
-        engine.stop()
-    
-    # Set up callback to record equity curve
-    def record_equity(data):
-        logger.debug(f"record_equity callback called with data for {len(data)} symbols")
-        portfolio = execution_provider.get_portfolio()
-        equity_curve.append(portfolio.equity)
-        timestamps.append(list(data.values())[0].timestamp if data else datetime.now())
-        logger.debug(f"Added equity point: {portfolio.equity} at {timestamps[-1]}")
-    
-    # Add callback to data provider
-    data_provider.add_subscriber(record_equity)
-    logger.debug("Added record_equity callback to data provider")
-    
-    # Run backtest again to record equity curve
-    logger.info("Running backtest again to record equity curve")
-    engine.run_backtest()
+    equity_curve = equity_curve[:num_recorded]
+    timestamps = timestamps[:num_recorded]
     
     # Check if we have any data points
-    if not timestamps:
+    if not num_recorded:
         logger.warning("No data points were recorded during the backtest. Cannot generate performance metrics or plots.")
         return
     
     # Calculate additional performance metrics
-    days = (timestamps[-1] - timestamps[0]).days or 1
+    days = int((timestamps[-1] - timestamps[0]) // np.timedelta64(1, 'D')) or 1
     perf_metrics = calculate_performance_metrics(equity_curve, days)
     
     # Print additional performance metrics
@@ -6,84 +6,152 @@ import os
 import argparse
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from typing import List, Optional
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    _HAVE_PYARROW = True
+except ImportError:  # PyArrow is an optional dependency
+    _HAVE_PYARROW = False
 
-def generate_random_walk(start_price: float, days: int, volatility: float = 0.01,
-                        trend: float = 0.0001) -> pd.DataFrame:
+
+def _daily_timestamps(days: int) -> pd.DatetimeIndex:
     """
-    Generate a random walk price series.
+    Generate daily timestamps at midnight, ending yesterday.
+    
+    Args:
+        days: Number of days to generate
+        
+    Returns:
+        DatetimeIndex of the days
+    """
+    return pd.date_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=days, freq='D')
+
+
+def _ohlcv_frames(timestamps: pd.DatetimeIndex, prices: np.ndarray, volatility: float,
+                  rng: np.random.Generator) -> List[pd.DataFrame]:
+    """
+    Build OHLCV bars around series of opening prices.
+    
+    All random draws are made for all series and days at once.
+    
+    Args:
+        timestamps: Timestamp of each bar
+        prices: Opening prices, one row per series
+        volatility: Daily volatility
+        rng: Random number generator
+        
+    Returns:
+        One DataFrame with float32 OHLCV data per series
+    """
+    shape = prices.shape
+    
+    # Intraday volatility of each bar
+    intraday_vol = volatility * prices * 0.5
+    
+    # Generate OHLC
+    open_prices = prices
+    high_prices = prices + np.abs(rng.normal(0, intraday_vol, shape))
+    low_prices = prices - np.abs(rng.normal(0, intraday_vol, shape))
+    close_prices = rng.normal(prices, intraday_vol, shape)
+    
+    # Ensure high >= open, close, low and low <= open, close
+    high_prices = np.maximum(high_prices, np.maximum(open_prices, close_prices))
+    low_prices = np.minimum(low_prices, np.minimum(open_prices, close_prices))
+    
+    # Generate volume
+    volumes = rng.lognormal(10, 1, shape)
+    
+    # Single precision is plenty for sample prices and halves the column sizes
+    columns = [values.astype(np.float32) for values in (open_prices, high_prices, low_prices,
+                                                        close_prices, volumes)]
+    return [
+        pd.DataFrame({
+            'timestamp': timestamps,
+            'open': columns[0][i],
+            'high': columns[1][i],
+            'low': columns[2][i],
+            'close': columns[3][i],
+            'volume': columns[4][i]
+        })
+        for i in range(shape[0])
+    ]
+
+
+def generate_random_walks(start_price: float, days: int, num_series: int, volatility: float = 0.01,
+                          trend: float = 0.0001,
+                          rng: Optional[np.random.Generator] = None) -> List[pd.DataFrame]:
+    """
+    Generate several random walk price series at once.
     
     Args:
         start_price: Starting price
         days: Number of days to generate
+        num_series: Number of series to generate
         volatility: Daily volatility
         trend: Daily trend
+        rng: Random number generator (optional, a new unseeded one is used if not given)
         
     Returns:
-        DataFrame with OHLCV data
+        One DataFrame with OHLCV data per series
     """
+    rng = rng or np.random.default_rng()
+    
     # Generate daily returns
-    daily_returns = np.random.normal(trend, volatility, days)
+    daily_returns = rng.normal(trend, volatility, (num_series, days))
     
     # Calculate price series
-    prices = start_price * np.cumprod(1 + daily_returns)
+    prices = start_price * np.cumprod(1 + daily_returns, axis=1)
     
     # Generate timestamps
-    start_date = datetime.now() - timedelta(days=days)
-    timestamps = [start_date + timedelta(days=i) for i in range(days)]
-    
-    # Generate OHLCV data
-    data = []
-    for i, price in enumerate(prices):
-        # Generate intraday volatility
-        intraday_vol = volatility * price * 0.5
-        
-        # Generate OHLC
-        open_price = price
-        high_price = price + abs(np.random.normal(0, intraday_vol))
-        low_price = price - abs(np.random.normal(0, intraday_vol))
-        close_price = np.random.normal(price, intraday_vol)
-        
-        # Ensure high >= open, close, low and low <= open, close
-        high_price = max(high_price, open_price, close_price)
-        low_price = min(low_price, open_price, close_price)
-        
-        # Generate volume
-        volume = np.random.lognormal(10, 1)
-        
-        data.append({
-            'timestamp': timestamps[i],
-            'open': open_price,
-            'high': high_price,
-            'low': low_price,
-            'close': close_price,
-            'volume': volume
-        })
+    timestamps = _daily_timestamps(days)
     
-    return pd.DataFrame(data)
+    return _ohlcv_frames(timestamps, prices, volatility, rng)
 
 
-def generate_sine_wave(start_price: float, days: int, amplitude: float = 10.0,
-                      period: float = 50.0, volatility: float = 0.01,
-                      trend: float = 0.0001) -> pd.DataFrame:
+def generate_random_walk(start_price: float, days: int, volatility: float = 0.01,
+                        trend: float = 0.0001,
+                        rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
     """
-    Generate a sine wave price series with noise.
+    Generate a random walk price series.
     
     Args:
         start_price: Starting price
         days: Number of days to generate
+        volatility: Daily volatility
+        trend: Daily trend
+        rng: Random number generator (optional, a new unseeded one is used if not given)
+        
+    Returns:
+        DataFrame with OHLCV data
+    """
+    return generate_random_walks(start_price, days, 1, volatility, trend, rng)[0]
+
+
+def generate_sine_waves(start_price: float, days: int, num_series: int, amplitude: float = 10.0,
+                        period: float = 50.0, volatility: float = 0.01, trend: float = 0.0001,
+                        rng: Optional[np.random.Generator] = None) -> List[pd.DataFrame]:
+    """
+    Generate several sine wave price series with noise at once.
+    
+    Args:
+        start_price: Starting price
+        days: Number of days to generate
+        num_series: Number of series to generate
         amplitude: Amplitude of sine wave
         period: Period of sine wave in days
         volatility: Daily volatility
         trend: Daily trend
+        rng: Random number generator (optional, a new unseeded one is used if not given)
         
     Returns:
-        DataFrame with OHLCV data
+        One DataFrame with OHLCV data per series
     """
+    rng = rng or np.random.default_rng()
+    
     # Generate timestamps
-    start_date = datetime.now() - timedelta(days=days)
-    timestamps = [start_date + timedelta(days=i) for i in range(days)]
+    timestamps = _daily_timestamps(days)
     
     # Generate sine wave
     t = np.arange(days)
@@ -93,40 +161,50 @@ def generate_sine_wave(start_price: float, days: int, amplitude: float = 10.0,
     trend_series = np.arange(days) * trend
     
     # Generate noise
-    noise = np.random.normal(0, volatility * start_price, days)
+    noise = rng.normal(0, volatility * start_price, (num_series, days))
     
     # Combine components
     prices = start_price + sine_wave + trend_series + noise
     
-    # Generate OHLCV data
-    data = []
-    for i, price in enumerate(prices):
-        # Generate intraday volatility
-        intraday_vol = volatility * price * 0.5
-        
-        # Generate OHLC
-        open_price = price
-        high_price = price + abs(np.random.normal(0, intraday_vol))
-        low_price = price - abs(np.random.normal(0, intraday_vol))
-        close_price = np.random.normal(price, intraday_vol)
-        
-        # Ensure high >= open, close, low and low <= open, close
-        high_price = max(high_price, open_price, close_price)
-        low_price = min(low_price, open_price, close_price)
-        
-        # Generate volume
-        volume = np.random.lognormal(10, 1)
+    return _ohlcv_frames(timestamps, prices, volatility, rng)
+
+
+def generate_sine_wave(start_price: float, days: int, amplitude: float = 10.0,
+                      period: float = 50.0, volatility: float = 0.01,
+                      trend: float = 0.0001,
+                      rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """
+    Generate a sine wave price series with noise.
+    
+    Args:
+        start_price: Starting price
+        days: Number of days to generate
+        amplitude: Amplitude of sine wave
+        period: Period of sine wave in days
+        volatility: Daily volatility
+        trend: Daily trend
+        rng: Random number generator (optional, a new unseeded one is used if not given)
         
-        data.append({
-            'timestamp': timestamps[i],
-            'open': open_price,
-            'high': high_price,
-            'low': low_price,
-            'close': close_price,
-            'volume': volume
-        })
+    Returns:
+        DataFrame with OHLCV data
+    """
+    return generate_sine_waves(start_price, days, 1, amplitude, period, volatility, trend, rng)[0]
+
+
+def write_csv(df: pd.DataFrame, output_file: str):
+    """
+    Write OHLCV data to a CSV file, with PyArrow's native writer if it is installed.
     
-    return pd.DataFrame(data)
+    Args:
+        df: DataFrame with OHLCV data
+        output_file: Path of the CSV file
+    """
+    if _HAVE_PYARROW:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pa_csv.write_csv(table, output_file, pa_csv.WriteOptions(quoting_style='none'))
+    else:
+        # Full timestamps, in the default date format of CSVDataProvider
+        df.to_csv(output_file, index=False, date_format='%Y-%m-%d %H:%M:%S.%f')
 
 
 def parse_args():
@@ -148,6 +226,8 @@ def parse_args():
     parser.add_argument('--pattern', type=str, default='random',
                        choices=['random', 'sine'],
                        help='Price pattern to generate')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed (optional, for reproducible data)')
     
     return parser.parse_args()
 
@@ -158,36 +238,37 @@ def main():
     args = parse_args()
     
     # Create output directory if it doesn't exist
-    if not os.path.exists(args.output_dir):
-        os.makedirs(args.output_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
     
-    # Generate data for each symbol
-    for symbol in args.symbols:
-        print(f"Generating data for {symbol}...")
-        
-        # Generate price series
-        if args.pattern == 'random':
-            df = generate_random_walk(
-                start_price=args.start_price,
-                days=args.days,
-                volatility=args.volatility,
-                trend=args.trend
-            )
-        else:  # sine
-            df = generate_sine_wave(
-                start_price=args.start_price,
-                days=args.days,
-                amplitude=args.start_price * 0.1,
-                period=50.0,
-                volatility=args.volatility,
-                trend=args.trend
-            )
-        
+    # Generate the price series of all symbols at once
+    print(f"Generating data for {', '.join(args.symbols)}...")
+    rng = np.random.default_rng(args.seed)
+    if args.pattern == 'random':
+        frames = generate_random_walks(
+            start_price=args.start_price,
+            days=args.days,
+            num_series=len(args.symbols),
+            volatility=args.volatility,
+            trend=args.trend,
+            rng=rng
+        )
+    else:  # sine
+        frames = generate_sine_waves(
+            start_price=args.start_price,
+            days=args.days,
+            num_series=len(args.symbols),
+            amplitude=args.start_price * 0.1,
+            period=50.0,
+            volatility=args.volatility,
+            trend=args.trend,
+            rng=rng
+        )
+    
+    for symbol, df in zip(args.symbols, frames):
         # Save to CSV
         output_file = os.path.join(args.output_dir, f"{symbol}.csv")
-        df.to_csv(output_file, index=False)
+        write_csv(df, output_file)
         print(f"Saved {len(df)} rows to {output_file}")
 
-
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -3,22 +3,17 @@
 Script to run a backtest using a configuration file.
 """
 import os
-import sys
 import argparse
+import copy
+import json
+import hashlib
 import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
-# Add parent directory to path to import easytrade
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from easytrade.core.engine import TradingEngine
-from easytrade.core.risk_manager import RiskManager
-from easytrade.data.csv_provider import CSVDataProvider
-from easytrade.execution.backtest import BacktestExecutionProvider
-from easytrade.strategies.moving_average import MovingAverageCrossoverStrategy
-from easytrade.utils.logger import setup_logger
-from easytrade.utils.config import load_config
-from easytrade.utils.performance import calculate_performance_metrics, plot_equity_curve, plot_drawdown
+# NumPy, pandas and the easytrade modules are imported where they are used,
+# so that --help and configuration errors do not wait for them
 
 
 def parse_args():
@@ -27,12 +22,16 @@ def parse_args():
     
     parser.add_argument('--config', type=str, default='examples/config.yaml',
                        help='Path to configuration file')
+    parser.add_argument('--no-plots', action='store_true',
+                       help='Only print metrics, without loading matplotlib or saving plots')
     
     return parser.parse_args()
 
 
 def create_data_provider(config):
     """Create a data provider based on configuration."""
+    from easytrade.data.csv_provider import CSVDataProvider
+    
     data_config = config.get('data_provider', {})
     provider_type = data_config.get('type', 'csv')
     
@@ -41,7 +40,8 @@ def create_data_provider(config):
             data_dir=data_config.get('data_dir', 'data'),
             date_format=data_config.get('date_format', '%Y-%m-%d %H:%M:%S'),
             timestamp_column=data_config.get('timestamp_column', 'timestamp'),
-            ohlcv_columns=data_config.get('ohlcv_columns')
+            ohlcv_columns=data_config.get('ohlcv_columns'),
+            cache_files=data_config.get('cache_files', False)
         )
         
         # Set replay speed
@@ -55,6 +55,8 @@ def create_data_provider(config):
 
 def create_execution_provider(config):
     """Create an execution provider based on configuration."""
+    from easytrade.execution.backtest import BacktestExecutionProvider
+    
     exec_config = config.get('execution_provider', {})
     provider_type = exec_config.get('type', 'backtest')
     
@@ -69,6 +71,8 @@ def create_execution_provider(config):
 
 def create_risk_manager(config):
     """Create a risk manager based on configuration."""
+    from easytrade.core.risk_manager import RiskManager
+    
     risk_config = config.get('risk_manager', {})
     
     return RiskManager(
@@ -81,6 +85,8 @@ def create_risk_manager(config):
 
 def create_strategy(config):
     """Create a strategy based on configuration."""
+    from easytrade.strategies.moving_average import MovingAverageCrossoverStrategy
+    
     strategy_config = config.get('strategy', {})
     strategy_type = strategy_config.get('type', 'moving_average_crossover')
     parameters = strategy_config.get('parameters', {})
@@ -89,7 +95,8 @@ def create_strategy(config):
         return MovingAverageCrossoverStrategy(
             short_window=parameters.get('short_window', 10),
             long_window=parameters.get('long_window', 50),
-            position_size=parameters.get('position_size', 0.1)
+            position_size=parameters.get('position_size', 0.1),
+            ma_type=parameters.get('ma_type', 'sma')
         )
     else:
         raise ValueError(f"Unsupported strategy type: {strategy_type}")
@@ -97,6 +104,8 @@ def create_strategy(config):
 
 def setup_logging(config):
     """Set up logging based on configuration."""
+    from easytrade.utils.logger import setup_logger
+    
     logging_config = config.get('logging', {})
     log_level = logging_config.get('level', 'INFO')
     log_file = logging_config.get('file')
@@ -106,26 +115,28 @@ def setup_logging(config):
         name='backtest',
         log_level=getattr(logging, log_level),
         log_file=log_file,
-        console_output=console_output
+        console_output=console_output,
+        use_queue=logging_config.get('queue', False)
     )
 
 
-def main():
-    """Run the backtest."""
-    # Parse command line arguments
-    args = parse_args()
-    
-    # Load configuration
-    config = load_config(args.config)
+def run_backtest(config, symbols, load_all_files=True):
+    """
+    Run a backtest for the given symbols and record its equity curve.
     
-    # Set up logging
-    logger = setup_logging(config)
+    Args:
+        config: Configuration dictionary
+        symbols: Symbols to trade
+        load_all_files: Load every CSV file in the data directory, rather than
+            only the files of the traded symbols
+        
+    Returns:
+        Tuple of (backtest metrics, equity curve, timestamps)
+    """
+    import numpy as np
+    from easytrade.core.engine import TradingEngine
     
-    # Create output directory if it doesn't exist
-    output_config = config.get('output', {})
-    output_dir = output_config.get('directory', 'output')
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    logger = logging.getLogger('backtest')
     
     # Create components
     data_provider = create_data_provider(config)
@@ -134,7 +145,6 @@ def main():
     strategy = create_strategy(config)
     
     # Set symbols for strategy
-    symbols = config.get('symbols', [])
     strategy.set_symbols(symbols)
     
     # Create trading engine
@@ -150,14 +160,208 @@ def main():
     
     # Load data
     logger.info(f"Loading data for symbols: {', '.join(symbols)}")
-    data_provider.load_directory()
+    if load_all_files:
+        data_provider.load_directory()
+    else:
+        for symbol in symbols:
+            data_provider.load_csv_file(os.path.join(data_provider.data_dir, f"{symbol}.csv"), symbol)
+    
+    # Create equity curve, with one point per replay step of the longest symbol
+    num_points = max(data_provider.snapshot_data_stats().values(), default=0)
+    equity_curve = np.empty(num_points, dtype=np.float64)
+    timestamps = np.empty(num_points, dtype='datetime64[ns]')
+    num_recorded = 0
+    
+    # Timestamp recorded for a step without any bars, taken once instead of on every step
+    fallback_timestamp = datetime.now()
+    
+    # Set up callback to record equity curve
+    def record_equity(data):
+        nonlocal num_recorded
+        logger.debug("record_equity callback called with data for %d symbols", len(data))
+        if num_recorded == num_points:
+            return
+        portfolio = execution_provider.get_portfolio()
+        equity_curve[num_recorded] = portfolio.equity
+        first_bar = next(iter(data.values()), None)
+        timestamps[num_recorded] = first_bar.timestamp if first_bar is not None else fallback_timestamp
+        num_recorded += 1
+        logger.debug("Added equity point: %s at %s", portfolio.equity, timestamps[num_recorded - 1])
+    
+    # Add callback to data provider, after the engine so it sees the updated portfolio
+    data_provider.add_subscriber(record_equity)
+    logger.debug("Added record_equity callback to data provider")
     
     # Run backtest
     logger.info("Starting backtest")
     engine.run_backtest()
     
-    # Get performance metrics
     metrics = execution_provider.get_performance_metrics()
+    return metrics, equity_curve[:num_recorded], timestamps[:num_recorded]
+
+
+def _run_symbol(symbol, config):
+    """Run the backtest of a single symbol, in a worker process."""
+    return run_backtest(config, [symbol], load_all_files=False)
+
+
+def run_parallel_backtests(config, symbols):
+    """
+    Backtest each symbol in its own process and combine the results.
+    
+    The initial cash is split evenly between the symbols, so the combined
+    portfolio starts with the configured cash. Each symbol trades on its own
+    cash, unlike a single backtest where all symbols share it.
+    
+    Args:
+        config: Configuration dictionary
+        symbols: Symbols to trade
+        
+    Returns:
+        Tuple of (combined backtest metrics, combined equity curve, timestamps)
+    """
+    import pandas as pd
+    
+    symbol_config = copy.deepcopy(config)
+    exec_config = symbol_config.setdefault('execution_provider', {})
+    exec_config['initial_cash'] = exec_config.get('initial_cash', 100000.0) / len(symbols)
+    
+    max_workers = min(len(symbols), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_run_symbol, symbols, itertools.repeat(symbol_config)))
+        
+    # Sum the equity curves on their combined timestamps; a symbol's equity is
+    # its initial cash before its first bar and its last value after its last bar
+    curves = pd.concat(
+        [pd.Series(equity_curve, index=timestamps) for _, equity_curve, timestamps in results],
+        axis=1
+    ).sort_index().ffill()
+    curves = curves.fillna({i: metrics['initial_cash'] for i, (metrics, _, _) in enumerate(results)})
+    
+    initial_cash = sum(metrics['initial_cash'] for metrics, _, _ in results)
+    pnl = sum(metrics['pnl'] for metrics, _, _ in results)
+    num_trades = sum(metrics['num_trades'] for metrics, _, _ in results)
+    wins = sum(metrics['win_ratio'] * metrics['num_trades'] for metrics, _, _ in results)
+    metrics = {
+        'initial_cash': initial_cash,
+        'final_equity': sum(metrics['final_equity'] for metrics, _, _ in results),
+        'pnl': pnl,
+        'pnl_percent': pnl / initial_cash * 100,
+        'num_trades': num_trades,
+        'win_ratio': wins / num_trades if num_trades > 0 else 0
+    }
+    
+    return metrics, curves.sum(axis=1).to_numpy(), curves.index.to_numpy()
+
+
+# Config sections that do not affect backtest results
+_UNCACHED_SECTIONS = ('logging', 'output')
+
+
+def results_cache_path(config, output_dir):
+    """
+    Get the path of the cached results of a backtest.
+    
+    The file name is a hash of the configuration, without the sections that do
+    not change the results, and of the modification times and sizes of the CSV
+    files in the data directory, so editing either starts a new cache file.
+    
+    Args:
+        config: Configuration dictionary
+        output_dir: Directory of the cache files
+        
+    Returns:
+        Path of the cache file
+    """
+    key = hashlib.sha256()
+    backtest_config = {section: value for section, value in config.items() if section not in _UNCACHED_SECTIONS}
+    key.update(json.dumps(backtest_config, sort_keys=True, default=str).encode())
+    
+    data_dir = config.get('data_provider', {}).get('data_dir', 'data')
+    if os.path.isdir(data_dir):
+        for filename in sorted(os.listdir(data_dir)):
+            if filename.endswith('.csv'):
+                stat = os.stat(os.path.join(data_dir, filename))
+                key.update(f"{filename}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+                
+    return os.path.join(output_dir, f"cache_{key.hexdigest()}.npz")
+
+
+def save_results(cache_path, metrics, equity_curve, timestamps):
+    """
+    Save the results of a backtest to a cache file.
+    
+    Args:
+        cache_path: Path of the cache file
+        metrics: Backtest metrics
+        equity_curve: Equity curve
+        timestamps: Timestamps of the equity curve
+    """
+    import numpy as np
+    
+    np.savez(
+        cache_path,
+        metric_names=np.array(list(metrics)),
+        metric_values=np.array(list(metrics.values()), dtype=np.float64),
+        equity=equity_curve,
+        timestamps=timestamps
+    )
+
+
+def load_results(cache_path):
+    """
+    Load the results of a backtest from a cache file.
+    
+    Args:
+        cache_path: Path of the cache file
+        
+    Returns:
+        Tuple of (backtest metrics, equity curve, timestamps)
+    """
+    import numpy as np
+    
+    with np.load(cache_path) as cache:
+        metrics = dict(zip(cache['metric_names'].tolist(), cache['metric_values'].tolist()))
+        metrics['num_trades'] = int(metrics['num_trades'])
+        return metrics, cache['equity'], cache['timestamps']
+
+
+def main():
+    """Run the backtest."""
+    # Parse command line arguments
+    args = parse_args()
+    
+    from easytrade.utils.config import load_config
+    
+    # Load configuration
+    config = load_config(args.config)
+    
+    # Set up logging
+    logger = setup_logging(config)
+    
+    # Create output directory if it doesn't exist
+    output_config = config.get('output', {})
+    output_dir = output_config.get('directory', 'output')
+    os.makedirs(output_dir, exist_ok=True)
+    
+    symbols = config.get('symbols', [])
+    backtest_config = config.get('backtest', {})
+    cache_path = results_cache_path(config, output_dir) if backtest_config.get('cache_results', False) else None
+    
+    if cache_path and os.path.exists(cache_path):
+        logger.info(f"Loading cached backtest results from {cache_path}")
+        metrics, equity_curve, timestamps = load_results(cache_path)
+    else:
+        if backtest_config.get('parallel', False) and len(symbols) > 1:
+            logger.info(f"Running {len(symbols)} symbol backtests in parallel")
+            metrics, equity_curve, timestamps = run_parallel_backtests(config, symbols)
+        else:
+            metrics, equity_curve, timestamps = run_backtest(config, symbols)
+            
+        if cache_path:
+            save_results(cache_path, metrics, equity_curve, timestamps)
+            logger.info(f"Saved backtest results to {cache_path}")
+    num_recorded = len(equity_curve)
     
     # Print performance metrics
     logger.info("Backtest completed")
@@ -167,42 +371,16 @@ def main():
     logger.info(f"Number of trades: {metrics['num_trades']}")
     logger.info(f"Win ratio: {metrics['win_ratio']:.2f}")
     
-    # Create equity curve
-    equity_curve = []
-    timestamps = []
-    
-    # Reset data provider and execution provider
-    data_provider.reset()
-    execution_provider.reset()
-    
-    # Make sure engine is not running
-    if hasattr(engine, '_running') and engine._running:
-        logger.debug("Stopping engine before second run")
-        engine.stop()
-    
-    # Set up callback to record equity curve
-    def record_equity(data):
-        logger.debug(f"record_equity callback called with data for {len(data)} symbols")
-        portfolio = execution_provider.get_portfolio()
-        equity_curve.append(portfolio.equity)
-        timestamps.append(list(data.values())[0].timestamp if data else datetime.now())
-        logger.debug(f"Added equity point: {portfolio.equity} at {timestamps[-1]}")
-    
-    # Add callback to data provider
-    data_provider.add_subscriber(record_equity)
-    logger.debug("Added record_equity callback to data provider")
-    
-    # Run backtest again to record equity curve
-    logger.info("Running backtest again to record equity curve")
-    engine.run_backtest()
-    
     # Check if we have any data points
-    if not timestamps:
+    if not num_recorded:
         logger.warning("No data points were recorded during the backtest. Cannot generate performance metrics or plots.")
         return
     
+    import numpy as np
+    from easytrade.utils.performance import calculate_performance_metrics
+    
     # Calculate additional performance metrics
-    days = (timestamps[-1] - timestamps[0]).days or 1
+    days = int((timestamps[-1] - timestamps[0]) // np.timedelta64(1, 'D')) or 1
     perf_metrics = calculate_performance_metrics(equity_curve, days)
     
     # Print additional performance metrics
@@ -212,6 +390,11 @@ def main():
     logger.info(f"Max drawdown: {perf_metrics['max_drawdown']:.2f}")
     logger.info(f"Calmar ratio: {perf_metrics['calmar_ratio']:.2f}")
     
+    if args.no_plots:
+        return
+        
+    from easytrade.utils.performance import plot_equity_curve, plot_drawdown
+    
     # Plot equity curve
     equity_plot = plot_equity_curve(equity_curve, timestamps)
     equity_plot.savefig(os.path.join(output_dir, 'equity_curve.png'))
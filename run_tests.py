@@ -6,6 +6,21 @@ import os
 import sys
 import unittest
 import argparse
+import importlib
+
+try:
+    import pytest
+    import xdist  # noqa: F401
+    _HAVE_XDIST = True
+except ImportError:  # pytest-xdist is an optional dependency
+    _HAVE_XDIST = False
+
+# Test modules loaded directly when the default test directory and pattern are used
+TEST_MODULES = ['tests.test_basic']
+
+# Defaults of the test directory and pattern arguments
+_DEFAULT_TEST_DIR = 'tests'
+_DEFAULT_PATTERN = 'test_*.py'
 
 
 def parse_args():
@@ -14,21 +29,46 @@ def parse_args():
     
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Verbose output')
-    parser.add_argument('--test-dir', type=str, default='tests',
+    parser.add_argument('--test-dir', type=str, default=_DEFAULT_TEST_DIR,
                        help='Directory containing tests')
-    parser.add_argument('--pattern', type=str, default='test_*.py',
+    parser.add_argument('--pattern', type=str, default=_DEFAULT_PATTERN,
                        help='Pattern to match test files')
+    parser.add_argument('--serial', action='store_true',
+                       help='Run the tests one at a time with unittest, even if pytest-xdist is installed')
     
     return parser.parse_args()
 
 
+def run_parallel(args) -> int:
+    """
+    Run the tests in one worker process per CPU with pytest-xdist.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        pytest exit code
+    """
+    pytest_args = ['-n', str(os.cpu_count() or 1), '-o', f'python_files={args.pattern}', args.test_dir]
+    if args.verbose:
+        pytest_args.append('-v')
+    return pytest.main(pytest_args)
+
+
 def main():
     """Run the tests."""
     args = parse_args()
     
-    # Discover and run tests
+    if _HAVE_XDIST and not args.serial:
+        sys.exit(run_parallel(args))
+    
+    # Load the known test modules, or discover tests in another directory or by another pattern
     loader = unittest.TestLoader()
-    tests = loader.discover(args.test_dir, pattern=args.pattern)
+    if args.test_dir == _DEFAULT_TEST_DIR and args.pattern == _DEFAULT_PATTERN:
+        tests = unittest.TestSuite(loader.loadTestsFromModule(importlib.import_module(name))
+                                   for name in TEST_MODULES)
+    else:
+        tests = loader.discover(args.test_dir, pattern=args.pattern)
     
     runner = unittest.TextTestRunner(verbosity=2 if args.verbose else 1)
     result = runner.run(tests)
@@ -38,4 +78,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -3,18 +3,22 @@
 Basic tests for the EasyTrade framework.
 """
 import os
-import sys
 import unittest
+import numpy as np
 from datetime import datetime, timedelta
 
-# Add parent directory to path to import easytrade
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from easytrade.core.types import Bar, Order, OrderType, OrderSide, TimeInForce, Position, Portfolio
+from easytrade.core.types import Bar, BarBatch, Order, OrderType, OrderSide, TimeInForce, Position, Portfolio
 from easytrade.core.strategy import Strategy
 from easytrade.data.csv_provider import CSVDataProvider
+from easytrade.data.shared_memory import SharedMemoryPublisher, SharedMemoryReader
 from easytrade.execution.backtest import BacktestExecutionProvider
+from easytrade.execution.vectorized_backtest import ORDER_DTYPE, run_vectorized_backtest
 from easytrade.core.engine import TradingEngine
+from easytrade.strategies.moving_average import MovingAverageCrossoverStrategy
+from easytrade.core._risk_kernels import (
+    evaluate_limits, LIMIT_APPROVED, LIMIT_MODIFIED, LIMIT_REJECTED_POSITION,
+    LIMIT_REJECTED_CONCENTRATION
+)
 
 
 class TestStrategy(Strategy):
@@ -30,6 +34,10 @@ class TestStrategy(Strategy):
     def on_data(self, data):
         self.bars_received += 1
         
+        # Only the first and last bars trade
+        if self.bars_received != 1 and self.bars_received != self.max_bars:
+            return
+            
         # Buy on first bar
         if self.bars_received == 1 and not self.bought:
             for symbol in data:
@@ -43,40 +51,51 @@ class TestStrategy(Strategy):
                 self.sold = True
 
 
+class QueuedOrderStrategy(Strategy):
+    """Test strategy that queues a buy order on the first bar."""
+    
+    def __init__(self):
+        super().__init__()
+        self.queued = False
+        
+    def on_data(self, data):
+        if not self.queued:
+            for symbol in data:
+                self.queue_order(symbol, OrderSide.BUY, 10)
+            self.queued = True
+
+
 class BasicTests(unittest.TestCase):
     """Basic tests for the EasyTrade framework."""
     
-    def setUp(self):
-        """Set up test environment."""
-        # Create a temporary directory for test data
-        self.test_dir = os.path.join(os.path.dirname(__file__), 'test_data')
-        if not os.path.exists(self.test_dir):
-            os.makedirs(self.test_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up test environment, shared by all tests since none of them change the test data."""
+        # Create a temporary directory for test data, per process so parallel test workers do not collide
+        cls.test_dir = os.path.join(os.path.dirname(__file__), f'test_data_{os.getpid()}')
+        os.makedirs(cls.test_dir, exist_ok=True)
             
         # Create a test CSV file
-        self.create_test_data()
+        cls.create_test_data()
         
-    def create_test_data(self):
+    @classmethod
+    def create_test_data(cls):
         """Create test data."""
-        import pandas as pd
+        import csv
         
         # Create test data
-        data = []
         start_date = datetime.now() - timedelta(days=10)
+        rows = [
+            ((start_date + timedelta(days=i)).strftime('%Y-%m-%d %H:%M:%S.%f'),
+             100 + i, 105 + i, 95 + i, 101 + i, 1000 + i * 100)
+            for i in range(10)
+        ]
         
-        for i in range(10):
-            data.append({
-                'timestamp': start_date + timedelta(days=i),
-                'open': 100 + i,
-                'high': 105 + i,
-                'low': 95 + i,
-                'close': 101 + i,
-                'volume': 1000 + i * 100
-            })
-            
         # Save to CSV
-        df = pd.DataFrame(data)
-        df.to_csv(os.path.join(self.test_dir, 'TEST.csv'), index=False)
+        with open(os.path.join(cls.test_dir, 'TEST.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            writer.writerows(rows)
         
     def test_bar_creation(self):
         """Test Bar object creation."""
@@ -95,6 +114,29 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(bar.close, 101.0)
         self.assertEqual(bar.volume, 1000.0)
         
+    def test_bar_batch(self):
+        """Test BarBatch conversion to and from Bar objects."""
+        timestamp = datetime.now()
+        data = {
+            "AAA": Bar(timestamp, 100.0, 105.0, 95.0, 101.0, 1000.0),
+            "BBB": Bar(timestamp, 50.0, 55.0, 45.0, 51.0, 2000.0)
+        }
+        
+        batch = BarBatch.from_bars(data)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.to_bars(), data)
+        
+        # Backtest provider fills orders from the batch
+        provider = BacktestExecutionProvider(initial_cash=10000.0)
+        provider.start()
+        provider.place_order(symbol="BBB", side=OrderSide.BUY, quantity=10.0)
+        provider.process_market_data_batch(batch)
+        
+        position = provider.get_position("BBB")
+        self.assertIsNotNone(position)
+        self.assertEqual(position.quantity, 10.0)
+        self.assertEqual(position.current_price, 51.0)
+        
     def test_order_creation(self):
         """Test Order object creation."""
         order = Order(
@@ -133,6 +175,17 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(bars[0].open, 100.0)
         self.assertEqual(bars[9].open, 109.0)
         
+    def test_historical_arrays(self):
+        """Test CSVDataProvider.get_historical_arrays."""
+        provider = CSVDataProvider(self.test_dir)
+        provider.load_directory()
+        
+        arrays = provider.get_historical_arrays("TEST", datetime.now() - timedelta(days=20))
+        
+        self.assertEqual(len(arrays['close']), 10)
+        self.assertEqual(arrays['open'][0], 100.0)
+        self.assertEqual(arrays['volume'][9], 1900.0)
+        
     def test_backtest_execution(self):
         """Test BacktestExecutionProvider."""
         provider = BacktestExecutionProvider(initial_cash=10000.0)
@@ -176,6 +229,112 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(position.symbol, "TEST")
         self.assertEqual(position.quantity, 10.0)
         
+    def test_vectorized_backtest(self):
+        """Test run_vectorized_backtest."""
+        # One symbol, rising by 1 per bar: open = close - 0.5, high = close + 1, low = close - 1
+        closes = np.arange(100.0, 110.0)
+        ohlc = np.stack([closes - 0.5, closes + 1, closes - 1, closes], axis=1)[:, np.newaxis, :]
+        
+        orders = np.zeros(2, dtype=ORDER_DTYPE)
+        orders[0] = (0, 0, OrderSide.BUY, OrderType.MARKET, 10.0, np.nan, np.nan)
+        orders[1] = (2, 0, OrderSide.SELL, OrderType.LIMIT, 10.0, 106.0, np.nan)
+        
+        result = run_vectorized_backtest(ohlc, orders, initial_cash=10000.0, commission_rate=0.0)
+        
+        self.assertEqual(result.fill_bars.tolist(), [1, 5])
+        self.assertEqual(result.fill_prices.tolist(), [100.5, 106.0])
+        self.assertEqual(result.positions[:, 0].tolist(), [0, 10, 10, 10, 10, 0, 0, 0, 0, 0])
+        self.assertAlmostEqual(result.equity[-1], 10055.0)
+        
+    def test_backtest_signals(self):
+        """Test vectorized moving average crossover signals."""
+        closes = np.array([5.0, 4.0, 3.0, 2.0, 3.0, 4.0, 5.0, 4.0, 3.0, 2.0])
+        
+        signals = MovingAverageCrossoverStrategy.backtest_signals(closes, 2, 4)
+        self.assertEqual(signals.tolist(), [0, 0, 0, 0, 0, 1, 0, 0, -1, 0])
+        
+        # Parameter sets are evaluated together
+        sweep = MovingAverageCrossoverStrategy.backtest_signals(closes, np.array([2, 1]), np.array([4, 3]))
+        self.assertEqual(sweep.shape, (2, len(closes)))
+        self.assertEqual(sweep[0].tolist(), signals.tolist())
+        
+    def test_shared_memory(self):
+        """Test publishing market data through shared memory."""
+        from multiprocessing import shared_memory
+        
+        timestamp = datetime(2024, 1, 2)
+        publisher = SharedMemoryPublisher(["AAA", "BBB"])
+        reader = SharedMemoryReader(publisher.name, ["AAA", "BBB"])
+        
+        # Symbols without a slot are ignored
+        publisher.on_data({
+            "AAA": Bar(timestamp, 100.0, 105.0, 95.0, 101.0, 1000.0),
+            "CCC": Bar(timestamp, 10.0, 15.0, 5.0, 11.0, 500.0)
+        })
+        sequence, bars = reader.read()
+        self.assertEqual(sequence, 1)
+        self.assertEqual(bars[0]['close'], 101.0)
+        self.assertEqual(bars[0]['timestamp'], np.datetime64(timestamp, 'ns').astype(np.int64))
+        self.assertEqual(bars[1]['close'], 0.0)
+        
+        publisher.on_data_batch(BarBatch.from_bars({
+            "BBB": Bar(timestamp, 50.0, 55.0, 45.0, 51.0, 2000.0)
+        }))
+        sequence, bars = reader.read()
+        self.assertEqual(sequence, 2)
+        self.assertEqual(reader.sequence, 2)
+        self.assertEqual(bars[0]['close'], 101.0)
+        self.assertEqual(bars[1]['open'], 50.0)
+        self.assertEqual(bars[1]['volume'], 2000.0)
+        
+        # A failed write still ends the update, so readers are not blocked
+        with self.assertRaises(Exception):
+            publisher.on_data({"AAA": Bar("not a timestamp", 1.0, 1.0, 1.0, 1.0, 1.0)})
+        self.assertEqual(reader.read(timeout=0.1)[0], 3)
+        
+        # Closing the publisher unlinks the block
+        name = publisher.name
+        reader.close()
+        publisher.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+            
+    def test_risk_limits(self):
+        """Test the risk limit kernel."""
+        # Small buy within all limits
+        status, _ = evaluate_limits(10000.0, 10.0, 10.0, 0.0, 0.0, True, 0.05, 0.1, 1.0)
+        self.assertEqual(status, LIMIT_APPROVED)
+        
+        # Order larger than max_order_size is reduced
+        status, quantity = evaluate_limits(10000.0, 100.0, 10.0, 0.0, 0.0, True, 0.05, 0.1, 1.0)
+        self.assertEqual(status, LIMIT_MODIFIED)
+        self.assertAlmostEqual(quantity, 50.0)
+        
+        # Buy when the position is already at its limit is rejected
+        status, _ = evaluate_limits(10000.0, 10.0, 10.0, 1000.0, 1000.0, True, 0.05, 0.1, 1.0)
+        self.assertEqual(status, LIMIT_REJECTED_POSITION)
+        
+        # First position in an empty portfolio is not held back by the concentration limit
+        status, _ = evaluate_limits(10000.0, 10.0, 10.0, 0.0, 0.0, True, 0.05, 0.1, 0.5)
+        self.assertEqual(status, LIMIT_APPROVED)
+        status, quantity = evaluate_limits(100000.0, 200.0, 100.0, 0.0, 0.0, True, 0.1, 0.2, 0.5)
+        self.assertEqual(status, LIMIT_MODIFIED)
+        self.assertAlmostEqual(quantity, 100.0)
+        
+        # Buy beyond the concentration limit of the other holdings is rejected
+        status, _ = evaluate_limits(10000.0, 10.0, 10.0, 300.0, 600.0, True, 0.1, 0.1, 0.5)
+        self.assertEqual(status, LIMIT_REJECTED_CONCENTRATION)
+        
+        # Concentration limit caps the order at the allowed additional value
+        status, quantity = evaluate_limits(10000.0, 80.0, 10.0, 0.0, 600.0, True, 0.1, 0.1, 0.5)
+        self.assertEqual(status, LIMIT_MODIFIED)
+        self.assertAlmostEqual(quantity, 60.0)
+        
+        # The tightest limit wins when several are exceeded
+        status, quantity = evaluate_limits(10000.0, 200.0, 10.0, 0.0, 600.0, True, 0.1, 0.1, 0.5)
+        self.assertEqual(status, LIMIT_MODIFIED)
+        self.assertAlmostEqual(quantity, 60.0)
+        
     def test_trading_engine(self):
         """Test TradingEngine with a simple strategy."""
         # Create components
@@ -203,21 +362,69 @@ class BasicTests(unittest.TestCase):
         self.assertTrue(strategy.bought)
         self.assertTrue(strategy.sold)
         
-        # Check portfolio
+        # The buy fills at the second bar's open of 101 with 0.1% commission; the
+        # sell is placed on the last bar, so it is still open when the data ends
         portfolio = execution_provider.get_portfolio()
-        self.assertNotEqual(portfolio.cash, 10000.0)  # Cash should be different from initial
+        np.testing.assert_allclose(portfolio.cash, 10000.0 - 10 * 101.0 * 1.001, rtol=1e-9)
         
-        # Get performance metrics
+        # The position is valued at the last close of 110
         metrics = execution_provider.get_performance_metrics()
-        self.assertIn('pnl', metrics)
+        np.testing.assert_allclose(metrics['final_equity'], portfolio.cash + 10 * 110.0, rtol=1e-9)
+        np.testing.assert_allclose(metrics['pnl'], 10 * (110.0 - 101.0) - 10 * 101.0 * 0.001, rtol=1e-9)
+        self.assertEqual(metrics['num_trades'], 1)
+        
+    def test_queued_orders(self):
+        """Test that orders queued by a strategy are placed as a batch."""
+        data_provider = CSVDataProvider(self.test_dir)
+        data_provider.set_replay_speed(1000.0)
+        execution_provider = BacktestExecutionProvider(initial_cash=10000.0)
+        strategy = QueuedOrderStrategy()
+        strategy.set_symbols(["TEST"])
+        
+        engine = TradingEngine(
+            data_provider=data_provider,
+            execution_provider=execution_provider,
+            strategy=strategy
+        )
+        
+        data_provider.load_directory()
+        engine.run_backtest()
+        
+        position = execution_provider.get_position("TEST")
+        self.assertIsNotNone(position)
+        self.assertEqual(position.quantity, 10.0)
+        self.assertEqual(strategy.pop_pending_orders(), [])
+        
+    def test_threaded_dispatch(self):
+        """Test TradingEngine handling data on its dispatch thread."""
+        data_provider = CSVDataProvider(self.test_dir)
+        data_provider.set_replay_speed(1000.0)
+        execution_provider = BacktestExecutionProvider(initial_cash=10000.0)
+        strategy = TestStrategy()
+        strategy.set_symbols(["TEST"])
+        
+        engine = TradingEngine(
+            data_provider=data_provider,
+            execution_provider=execution_provider,
+            strategy=strategy,
+            threaded_dispatch=True
+        )
+        
+        data_provider.load_directory()
+        engine.run_backtest()
+        
+        self.assertEqual(strategy.bars_received, 10)
+        self.assertTrue(strategy.bought)
+        self.assertTrue(strategy.sold)
         
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up after tests."""
         import shutil
         
         # Remove test directory
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        if os.path.exists(cls.test_dir):
+            shutil.rmtree(cls.test_dir)
 
 
 if __name__ == '__main__':